@@ -25,6 +25,7 @@ from app.core.database import Base
 from app.models.user import User
 from app.models.expense import Expense
 from app.models.category import Category
+from app.models.rollup import ExpenseDailyRollup
 
 target_metadata = Base.metadata
 
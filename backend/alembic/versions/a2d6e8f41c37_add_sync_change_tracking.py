@@ -0,0 +1,63 @@
+"""Add change sequence and tombstones for delta sync
+
+Revision ID: a2d6e8f41c37
+Revises: f3c8d1a6b592
+Create Date: 2026-10-18 17:12:40.361958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d6e8f41c37'
+down_revision: Union[str, Sequence[str], None] = 'f3c8d1a6b592'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows start at 0, so they only appear in full snapshots
+    op.add_column('users', sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('expenses', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('expenses', sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('categories', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('categories', sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('budgets', sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE expenses SET updated_at = created_at")
+    op.execute("UPDATE categories SET updated_at = created_at")
+
+    op.create_index('ix_expenses_user_change_seq', 'expenses', ['user_id', 'change_seq'], unique=False)
+    op.create_index('ix_categories_user_change_seq', 'categories', ['user_id', 'change_seq'], unique=False)
+    op.create_index('ix_budgets_user_change_seq', 'budgets', ['user_id', 'change_seq'], unique=False)
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tombstones_user_change_seq', 'tombstones', ['user_id', 'change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstones_user_change_seq', table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_index('ix_budgets_user_change_seq', table_name='budgets')
+    op.drop_index('ix_categories_user_change_seq', table_name='categories')
+    op.drop_index('ix_expenses_user_change_seq', table_name='expenses')
+    op.drop_column('budgets', 'change_seq')
+    op.drop_column('categories', 'change_seq')
+    op.drop_column('categories', 'updated_at')
+    op.drop_column('expenses', 'change_seq')
+    op.drop_column('expenses', 'updated_at')
+    op.drop_column('users', 'change_seq')
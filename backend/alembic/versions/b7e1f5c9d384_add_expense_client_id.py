@@ -0,0 +1,30 @@
+"""Add client-generated expense ids for offline sync
+
+Revision ID: b7e1f5c9d384
+Revises: a2d6e8f41c37
+Create Date: 2026-10-18 18:05:13.728401
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1f5c9d384'
+down_revision: Union[str, Sequence[str], None] = 'a2d6e8f41c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('expenses', sa.Column('client_id', sa.String(length=64), nullable=True))
+    op.create_index('uq_expenses_user_client_id', 'expenses', ['user_id', 'client_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_expenses_user_client_id', table_name='expenses')
+    op.drop_column('expenses', 'client_id')
@@ -0,0 +1,53 @@
+"""Add expense daily rollups
+
+Revision ID: c4f1d2a9b7e3
+Revises: ab9884091e7f
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f1d2a9b7e3'
+down_revision: Union[str, Sequence[str], None] = 'ab9884091e7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'expense_daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_expense_daily_rollups_id'), 'expense_daily_rollups', ['id'], unique=False)
+    op.create_index('ix_expense_daily_rollups_user_day', 'expense_daily_rollups', ['user_id', 'day'], unique=False)
+
+    # Backfill from existing expenses
+    op.execute(
+        """
+        INSERT INTO expense_daily_rollups (user_id, day, category_id, total, count)
+        SELECT user_id, date, category_id, SUM(amount), COUNT(id)
+        FROM expenses
+        GROUP BY user_id, date, category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expense_daily_rollups_user_day', table_name='expense_daily_rollups')
+    op.drop_index(op.f('ix_expense_daily_rollups_id'), table_name='expense_daily_rollups')
+    op.drop_table('expense_daily_rollups')
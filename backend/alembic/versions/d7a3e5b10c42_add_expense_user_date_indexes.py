@@ -0,0 +1,30 @@
+"""Add expense user/date indexes
+
+Revision ID: d7a3e5b10c42
+Revises: c4f1d2a9b7e3
+Create Date: 2026-10-18 11:03:47.220915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3e5b10c42'
+down_revision: Union[str, Sequence[str], None] = 'c4f1d2a9b7e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_expenses_user_date', 'expenses', ['user_id', 'date'], unique=False)
+    op.create_index('ix_expenses_user_category_date', 'expenses', ['user_id', 'category_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_category_date', table_name='expenses')
+    op.drop_index('ix_expenses_user_date', table_name='expenses')
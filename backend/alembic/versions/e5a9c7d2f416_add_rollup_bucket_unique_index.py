@@ -0,0 +1,66 @@
+"""Make expense daily rollup buckets unique
+
+Revision ID: e5a9c7d2f416
+Revises: b7e1f5c9d384
+Create Date: 2026-10-18 19:42:08.315274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c7d2f416'
+down_revision: Union[str, Sequence[str], None] = 'b7e1f5c9d384'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_rollups() -> None:
+    op.execute("DELETE FROM expense_daily_rollups")
+    op.execute(
+        """
+        INSERT INTO expense_daily_rollups (user_id, day, category_id, total, count)
+        SELECT user_id, date, category_id, SUM(amount), COUNT(id)
+        FROM expenses
+        GROUP BY user_id, date, category_id
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicate buckets (racing inserts, SET NULL after a category delete)
+    # would block the unique index; recompute them from expenses
+    _rebuild_rollups()
+    op.create_index(
+        'uq_expense_daily_rollups_bucket',
+        'expense_daily_rollups',
+        ['user_id', 'day', sa.text('coalesce(category_id, 0)')],
+        unique=True,
+    )
+
+    # Deleting a category merges its buckets explicitly; SET NULL would
+    # collide with the uncategorized bucket of the same day
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('expense_daily_rollups_category_id_fkey', 'expense_daily_rollups', type_='foreignkey')
+        op.create_foreign_key(
+            'expense_daily_rollups_category_id_fkey',
+            'expense_daily_rollups', 'categories',
+            ['category_id'], ['id'],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('expense_daily_rollups_category_id_fkey', 'expense_daily_rollups', type_='foreignkey')
+        op.create_foreign_key(
+            'expense_daily_rollups_category_id_fkey',
+            'expense_daily_rollups', 'categories',
+            ['category_id'], ['id'],
+            ondelete='SET NULL',
+        )
+    op.drop_index('uq_expense_daily_rollups_bucket', table_name='expense_daily_rollups')
@@ -0,0 +1,37 @@
+"""Add expense keyset pagination index
+
+Revision ID: e91b4c3f7a20
+Revises: d7a3e5b10c42
+Create Date: 2026-10-18 14:22:05.518342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b4c3f7a20'
+down_revision: Union[str, Sequence[str], None] = 'd7a3e5b10c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset cursors compare created_at, which must not be NULL
+    op.execute(sa.text(
+        "UPDATE expenses SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"
+    ))
+    op.create_index(
+        'ix_expenses_user_date_created_id',
+        'expenses',
+        ['user_id', sa.text('date DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_date_created_id', table_name='expenses')
@@ -0,0 +1,66 @@
+"""Add expense description full-text search
+
+Revision ID: f3c8d1a6b592
+Revises: e91b4c3f7a20
+Create Date: 2026-10-18 15:41:27.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8d1a6b592'
+down_revision: Union[str, Sequence[str], None] = 'e91b4c3f7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts "
+    "USING fts5(description, content='expenses', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO expenses_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_au AFTER UPDATE OF description ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO expenses_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+    # Index the rows that already exist
+    "INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.create_index(
+            'ix_expenses_description_fts',
+            'expenses',
+            [sa.text("to_tsvector('simple', coalesce(description, ''))")],
+            unique=False,
+            postgresql_using='gin',
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_expenses_description_fts', table_name='expenses')
+    elif dialect == 'sqlite':
+        op.execute(sa.text("DROP TRIGGER IF EXISTS expenses_fts_au"))
+        op.execute(sa.text("DROP TRIGGER IF EXISTS expenses_fts_ad"))
+        op.execute(sa.text("DROP TRIGGER IF EXISTS expenses_fts_ai"))
+        op.execute(sa.text("DROP TABLE IF EXISTS expenses_fts"))
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import hash_password, verify_password, create_access_token
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserRead, Token, UserUpdate, ForgotPasswordRequest, ResetPasswordRequest
 import app.schemas as schemas
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, user_cache_key
+from app.utils.local_cache import local_cache
+from app.utils.redis_client import redis_client
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -44,10 +48,7 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
         {"name": "Income", "icon": "💰", "color": "#10b981"},
     ]
     
-    for c in default_cats:
-        cat = Category(user_id=user.id, name=c["name"], icon=c["icon"], color=c["color"])
-        db.add(cat)
-    
+    db.execute(insert(Category), [{**c, "user_id": user.id} for c in default_cats])
     db.commit()
 
     return user
@@ -199,21 +200,31 @@ def read_me(current_user: User = Depends(get_current_user)):
 
 
 @router.put("/profile", response_model=UserRead)
-def update_profile(user_update: UserUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_profile(
+    user_update: UserUpdate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     if user_update.username is not None:
         current_user.username = user_update.username
         db.commit()
         db.refresh(current_user)
+
+        # Drop cached user snapshots here and on the other workers
+        cache_key = user_cache_key(current_user.id)
+        local_cache.delete(cache_key)
+        background_tasks.add_task(redis_client.invalidate_local, cache_key)
     return current_user
 
 @router.post("/forgot-password", status_code=200)
-async def forgot_password(request: schemas.auth.ForgotPasswordRequest, db: Session = Depends(get_db)):
+async def forgot_password(request: schemas.auth.ForgotPasswordRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Trigger password reset email.
     Always returns 200 to prevent user enumeration.
     """
     print(f"DEBUG: Password reset requested for '{request.email}'")
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     if not user:
         print(f"DEBUG: User not found for '{request.email}'")
         # Return success even if user not found to prevent enumeration
@@ -232,7 +243,7 @@ async def forgot_password(request: schemas.auth.ForgotPasswordRequest, db: Sessi
     from datetime import datetime, timedelta
     user.reset_token_hash = otp_hash
     user.reset_token_expires_at = datetime.utcnow() + timedelta(minutes=15)
-    db.commit()
+    await db.commit()
     
     # Send Email
     try:
@@ -1,52 +1,87 @@
 from typing import List
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, select
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.budget import Budget
 from app.models.expense import Expense
+from app.models.rollup import ExpenseDailyRollup
 from app.models.user import User
 from app.schemas.budget import BudgetCreate, BudgetRead, BudgetUpdate
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user_async
+from app.utils.dates import MAX_YEAR, MIN_YEAR, month_range
+from app.utils import changes
+from app.utils.invalidation import invalidations
+from app.utils.redis_client import redis_client
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
 
+async def _month_spend_by_category(
+    db: AsyncSession, user_id: int, year: int, month: int
+) -> dict[int | None, float]:
+    """
+    Spend per category (None = uncategorized) for one month.
+    Read from the cached /stats/categories view when present, otherwise
+    from one grouped query over the daily rollups.
+    """
+    generation, _ = await invalidations.versions(user_id)
+    if generation is not None:
+        view = await redis_client.get_cache(
+            redis_client.user_key(user_id, generation, "category", year, month)
+        )
+        if view is not None:
+            return {c["category_id"]: c["total_amount"] for c in view["categories"]}
+
+    start, end = month_range(year, month)
+    rows = (
+        await db.execute(
+            select(
+                ExpenseDailyRollup.category_id,
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
+            )
+            .filter(ExpenseDailyRollup.user_id == user_id)
+            .filter(ExpenseDailyRollup.day >= start, ExpenseDailyRollup.day < end)
+            .group_by(ExpenseDailyRollup.category_id)
+        )
+    ).all()
+    return {r.category_id: float(r.total) for r in rows}
+
 @router.get("/", response_model=List[BudgetRead])
-def list_budgets(
-    year: int | None = Query(None),
-    month: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_budgets(
+    year: int | None = Query(None, ge=MIN_YEAR, le=MAX_YEAR),
+    month: int | None = Query(None, ge=1, le=12),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     today = date.today()
     y = year or today.year
     m = month or today.month
+    start, end = month_range(y, m)
 
     try:
         # 1. Get Budgets for the month
         budgets = (
-            db.query(Budget)
-            .filter(Budget.user_id == current_user.id)
-            .filter(func.extract("year", Budget.month) == y)
-            .filter(func.extract("month", Budget.month) == m)
-            .all()
-        )
+            await db.scalars(
+                select(Budget)
+                .options(selectinload(Budget.category))
+                .filter(Budget.user_id == current_user.id)
+                .filter(Budget.month >= start, Budget.month < end)
+            )
+        ).all()
+
+        # 2. Spend for all of them at once
+        spent_by_category = await _month_spend_by_category(db, current_user.id, y, m) if budgets else {}
         
         results = []
         for budget in budgets:
-            query = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-                Expense.user_id == current_user.id,
-                func.extract("year", Expense.date) == y,
-                func.extract("month", Expense.date) == m,
-            )
-            
             if budget.category_id:
-                query = query.filter(Expense.category_id == budget.category_id)
                 # Note: Global expenses (category_id IS NULL) are not counted in category budgets
-            
-            spent = query.scalar() or 0.0
+                spent = spent_by_category.get(budget.category_id, 0.0)
+            else:
+                spent = round(sum(spent_by_category.values()), 2)
 
             # Safe validation
             b_read = BudgetRead.model_validate(budget)
@@ -61,39 +96,41 @@ def list_budgets(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/", response_model=BudgetRead)
-def create_budget(
+async def create_budget(
     budget_in: BudgetCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     # Normalize to 1st of month
     normalized_month = date(budget_in.month.year, budget_in.month.month, 1)
 
     try:
         # Check if budget already exists
-        exists = (
-            db.query(Budget)
+        exists = await db.scalar(
+            select(Budget)
             .filter(Budget.user_id == current_user.id)
             .filter(Budget.month == normalized_month)
             .filter(Budget.category_id == budget_in.category_id)
-            .first()
         )
         
         if exists:
             # UPSERT Logic
             exists.amount = budget_in.amount
-            db.commit()
-            db.refresh(exists)
+            exists.change_seq = await changes.next_change_seq(db, current_user.id)
+            await db.commit()
+            await db.refresh(exists, ["category"])
+            await invalidations.schedule(current_user.id)
             
-            spent_query = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
+            start, end = month_range(exists.month.year, exists.month.month)
+            spent_query = select(func.coalesce(func.sum(Expense.amount), 0)).filter(
                 Expense.user_id == current_user.id,
-                func.extract("year", Expense.date) == exists.month.year,
-                func.extract("month", Expense.date) == exists.month.month,
+                Expense.date >= start,
+                Expense.date < end,
             )
             if exists.category_id:
                 spent_query = spent_query.filter(Expense.category_id == exists.category_id)
                 
-            spent = spent_query.scalar() or 0.0
+            spent = await db.scalar(spent_query) or 0.0
             
             b_read = BudgetRead.model_validate(exists)
             b_read.spent = float(spent)
@@ -109,8 +146,10 @@ def create_budget(
             month=normalized_month
         )
         db.add(budget)
-        db.commit()
-        db.refresh(budget)
+        budget.change_seq = await changes.next_change_seq(db, current_user.id)
+        await db.commit()
+        await db.refresh(budget, ["category"])
+        await invalidations.schedule(current_user.id)
         
         b_read = BudgetRead.model_validate(budget)
         b_read.spent = 0.0
@@ -121,15 +160,20 @@ def create_budget(
          raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{budget_id}")
-def delete_budget(
+async def delete_budget(
     budget_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    budget = db.query(Budget).filter(Budget.id == budget_id, Budget.user_id == current_user.id).first()
+    budget = await db.scalar(
+        select(Budget).where(Budget.id == budget_id, Budget.user_id == current_user.id)
+    )
     if not budget:
         raise HTTPException(status_code=404, detail="Budget not found")
         
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    seq = await changes.next_change_seq(db, current_user.id)
+    await changes.add_tombstones(db, current_user.id, changes.BUDGET, [budget_id], seq)
+    await db.commit()
+    await invalidations.schedule(current_user.id)
     return {"message": "Budget deleted"}
@@ -1,11 +1,17 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.models.category import Category
 from app.models.user import User
 from app.schemas.category import CategoryCreate, CategoryUpdate, Category as CategoryOut
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_user_async
+from app.api.expenses import invalidate_user_cache
+from app.utils import changes
+from app.utils.invalidation import invalidations
+from app.utils.rollups import merge_category_rollups
 
 router = APIRouter()
 
@@ -26,28 +32,28 @@ def read_categories(
     return categories
 
 @router.post("/", response_model=CategoryOut)
-def create_category(
+async def create_category(
     category_in: CategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     category = Category(**category_in.dict(), user_id=current_user.id)
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    category.change_seq = await changes.next_change_seq(db, current_user.id)
+    await db.commit()
+    await db.refresh(category)
+    await invalidations.schedule(current_user.id)
     return category
 
 @router.put("/{category_id}", response_model=CategoryOut)
-def update_category(
+async def update_category(
     category_id: int,
     category_in: CategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    category = (
-        db.query(Category)
-        .filter(Category.id == category_id, Category.user_id == current_user.id)
-        .first()
+    category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.user_id == current_user.id)
     )
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -56,31 +62,33 @@ def update_category(
         setattr(category, key, value)
     
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    category.change_seq = await changes.next_change_seq(db, current_user.id)
+    await db.commit()
+    await db.refresh(category)
+
+    # Cached stats carry category names
+    await invalidate_user_cache(current_user.id)
     return category
 
 @router.delete("/{category_id}")
-def delete_category(
+async def delete_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     from app.models.expense import Expense
     
-    category = (
-        db.query(Category)
-        .filter(Category.id == category_id, Category.user_id == current_user.id)
-        .first()
+    category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.user_id == current_user.id)
     )
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     # Count linked expenses
-    expense_count = (
-        db.query(Expense)
-        .filter(Expense.category_id == category_id, Expense.user_id == current_user.id)
-        .count()
+    expense_count = await db.scalar(
+        select(func.count())
+        .select_from(Expense)
+        .where(Expense.category_id == category_id, Expense.user_id == current_user.id)
     )
     
     # Warning: inform user about expense reassignment
@@ -90,17 +98,31 @@ def delete_category(
         # For now, we'll allow deletion but the client should show a confirmation
         pass  # Deletion proceeds, expenses will have category_id set to NULL
     
-    db.delete(category)
-    db.commit()
+    # Uncategorize its expenses explicitly, so they sync as changed
+    seq = await changes.next_change_seq(db, current_user.id)
+    if expense_count > 0:
+        await db.execute(
+            update(Expense)
+            .where(Expense.category_id == category_id, Expense.user_id == current_user.id)
+            .values(category_id=None, change_seq=seq)
+            .execution_options(synchronize_session=False)
+        )
+        await db.run_sync(merge_category_rollups, current_user.id, category_id)
+    await db.delete(category)
+    await changes.add_tombstones(db, current_user.id, changes.CATEGORY, [category_id], seq)
+    await db.commit()
+
+    # Its spend moves to "Uncategorized" in every cached stats view
+    await invalidate_user_cache(current_user.id)
     return {
         "message": "Category deleted",
         "affected_expenses": expense_count
     }
 
 @router.post("/seed", response_model=List[CategoryOut])
-def seed_default_categories(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def seed_default_categories(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     defaults = [
         {"name": "Food", "color": "#ef4444", "icon": "🍔"},
@@ -119,18 +141,30 @@ def seed_default_categories(
         {"name": "Rent", "color": "#a855f7", "icon": "🏠"},
     ]
     
-    created = []
-    for data in defaults:
-        # Check if exists
-        exists = db.query(Category).filter(Category.user_id == current_user.id, Category.name == data["name"]).first()
-        if not exists:
-            cat = Category(**data, user_id=current_user.id)
-            db.add(cat)
-            created.append(cat)
-    
-    db.commit()
-    for cat in created:
-        db.refresh(cat)
+    # One lookup for all defaults the user already has
+    existing = set(
+        (await db.scalars(
+            select(Category.name).where(
+                Category.user_id == current_user.id,
+                Category.name.in_([data["name"] for data in defaults]),
+            )
+        )).all()
+    )
+
+    created = [
+        {**data, "user_id": current_user.id}
+        for data in defaults
+        if data["name"] not in existing
+    ]
+    if created:
+        seq = await changes.next_change_seq(db, current_user.id)
+        for data in created:
+            data["change_seq"] = seq
+        # Bulk insert: one executemany instead of an INSERT per category
+        await db.execute(insert(Category), created)
+    await db.commit()
+    if created:
+        await invalidations.schedule(current_user.id)
         
     # Return all categories including old ones
-    return db.query(Category).filter(Category.user_id == current_user.id).all()
+    return (await db.scalars(select(Category).where(Category.user_id == current_user.id))).all()
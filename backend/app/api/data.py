@@ -2,12 +2,18 @@ import csv
 import io
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.core.database import get_db, get_async_db
+from app.api.deps import get_current_user, get_current_user_async, get_idempotency_key
 from app.models.user import User
 from app.models.expense import Expense
 from app.models.category import Category
+from app.utils.rollups import add_bucket_delta, apply_rollup_deltas
+from app.api.expenses import invalidate_user_cache
+from app.utils import changes
+from app.utils.idempotency import IdempotencyKey
 from datetime import datetime
 
 router = APIRouter(prefix="/data", tags=["data"])
@@ -17,8 +23,12 @@ def export_data(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Fetch all expenses
-    expenses = db.query(Expense).filter(Expense.user_id == current_user.id).all()
+    # Just the exported columns, category name joined in the same query
+    rows = db.execute(
+        select(Expense.date, Expense.amount, Expense.description, Category.name)
+        .outerjoin(Category, Expense.category_id == Category.id)
+        .where(Expense.user_id == current_user.id)
+    ).all()
     
     # Create CSV in memory
     output = io.StringIO()
@@ -27,9 +37,8 @@ def export_data(
     # Header
     writer.writerow(["Date", "Amount", "Description", "Category"])
     
-    for e in expenses:
-        cat_name = e.category.name if e.category else "Uncategorized"
-        writer.writerow([e.date, e.amount, e.description, cat_name])
+    for day, amount, description, cat_name in rows:
+        writer.writerow([day, amount, description, cat_name or "Uncategorized"])
         
     output.seek(0)
     
@@ -42,22 +51,33 @@ def export_data(
 @router.post("/import")
 async def import_data(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: IdempotencyKey | None = Depends(get_idempotency_key),
 ):
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
         
     content = await file.read()
+    if idempotency is not None:
+        replay = await idempotency.claim(content)
+        if replay is not None:
+            return replay
     decoded = content.decode("utf-8")
     io_string = io.StringIO(decoded)
     reader = csv.DictReader(io_string)
     
     # Cache categories to avoid DB hits
-    categories = {c.name.lower(): c for c in db.query(Category).filter((Category.user_id == current_user.id) | (Category.user_id == None)).all()}
+    categories = {c.name.lower(): c for c in (await db.scalars(select(Category).filter((Category.user_id == current_user.id) | (Category.user_id == None)))).all()}
     
     count = 0
+    # (day, category_id) -> (amount, count), applied to the rollups in one pass
+    rollup_deltas = {}
     try:
+        # Before any write: takes the user's row lock, and new rows are
+        # inserted already stamped (a flush below must not leave them to
+        # be updated again at commit)
+        seq = await changes.next_change_seq(db, current_user.id)
         for row in reader:
             # Expected cols: Date, Amount, Description, Category
             date_str = row.get("Date")
@@ -77,9 +97,11 @@ async def import_data(
             cat_obj = categories.get(cat_name.lower())
             if not cat_obj and cat_name:
                 # Create new category if not exists
-                cat_obj = Category(name=cat_name, user_id=current_user.id, color="#94a3b8", icon="📁")
+                cat_obj = Category(
+                    name=cat_name, user_id=current_user.id, color="#94a3b8", icon="📁", change_seq=seq
+                )
                 db.add(cat_obj)
-                db.flush() # Get ID
+                await db.flush() # Get ID
                 categories[cat_name.lower()] = cat_obj
                 
             expense = Expense(
@@ -87,14 +109,24 @@ async def import_data(
                 date=date_obj,
                 amount=float(amount_str),
                 description=desc,
-                category_id=cat_obj.id if cat_obj else None
+                category_id=cat_obj.id if cat_obj else None,
+                change_seq=seq,
             )
             db.add(expense)
             count += 1
+            add_bucket_delta(rollup_deltas, expense.date, expense.category_id, expense.amount, 1)
             
-        db.commit()
+        await db.run_sync(apply_rollup_deltas, current_user.id, rollup_deltas)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {str(e)}")
+
+    result = {"message": f"Successfully imported {count} expenses"}
+    if idempotency is not None:
+        await idempotency.save(200, result)
+
+    if count:
+        await invalidate_user_cache(current_user.id)
         
-    return {"message": f"Successfully imported {count} expenses"}
+    return result
@@ -1,12 +1,15 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import decode_token
 from app.models.user import User
+from app.utils.idempotency import MAX_KEY_LENGTH, IdempotencyKey
+from app.utils.local_cache import local_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -22,25 +25,105 @@ def get_db_session() -> Session:
     return Depends(get_db)
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)],
-) -> User:
-    credentials_exception = HTTPException(
+def user_cache_key(user_id: int) -> str:
+    return f"auth:user:{user_id}"
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials.",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _user_id_from_token(token: str) -> int:
     try:
         payload = decode_token(token)
         user_id: str | None = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id)
     except Exception:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.get(User, int(user_id))
+
+def _cached_user(user_id: int) -> User | None:
+    # Column snapshot in the local cache saves the PK lookup on hot paths;
+    # merge(load=False) attaches it to the session without a SELECT.
+    cached = local_cache.get(user_cache_key(user_id))
+    if cached is None:
+        return None
+    user = User(**cached)
+    make_transient_to_detached(user)
+    return user
+
+
+def _cache_user(user: User, epoch: int):
+    # Skipped if an invalidation arrived since the row was read (epoch)
+    snapshot = {c.key: getattr(user, c.key) for c in User.__table__.columns}
+    local_cache.fill(user_cache_key(user.id), snapshot, epoch)
+
+
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[Session, Depends(get_db)],
+) -> User:
+    user_id = _user_id_from_token(token)
+
+    cached = _cached_user(user_id)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
+    epoch = local_cache.epoch
+    user = db.get(User, user_id)
+    if user is None:
+        raise _credentials_exception()
+
+    _cache_user(user, epoch)
+    return user
+
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> User:
+    """
+    Same as get_current_user, for routes running on the async session.
+    """
+    user_id = _user_id_from_token(token)
+
+    cached = _cached_user(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    epoch = local_cache.epoch
+    user = await db.get(User, user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    _cache_user(user, epoch)
     return user
+
+
+async def get_idempotency_key(
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_user_async)],
+    key: Annotated[str | None, Header(alias="Idempotency-Key")] = None,
+) -> AsyncIterator[IdempotencyKey | None]:
+    """
+    The request's Idempotency-Key, scoped to the user and endpoint (None
+    without the header). A key the endpoint claimed but did not save a
+    response for, e.g. because it failed, is released afterwards.
+    """
+    if key is None:
+        yield None
+        return
+    if not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+    idempotency = IdempotencyKey(current_user.id, f"{request.method}:{request.url.path}", key)
+    try:
+        yield idempotency
+    finally:
+        await idempotency.release()
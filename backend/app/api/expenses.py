@@ -1,65 +1,277 @@
-from datetime import date
+import hashlib
+from datetime import date, datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, desc, func, insert, select, tuple_, update
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.models.category import Category
 from app.models.expense import Expense
 from app.models.user import User
-from app.schemas.expense import ExpenseCreate, ExpenseRead, ExpenseUpdate
-from app.api.deps import get_current_user
+from app.schemas.expense import (
+    ExpenseBulkRequest,
+    ExpenseBulkResponse,
+    ExpenseCreate,
+    ExpenseRead,
+    ExpenseUpdate,
+)
+from app.api.deps import get_current_user_async, get_idempotency_key
+from app.utils import changes
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.idempotency import IdempotencyKey
+from app.utils.invalidation import invalidations
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
 from app.utils.redis_client import redis_client
+from app.utils.search import apply_description_search, search_terms
+from app.utils.rollups import (
+    add_bucket_delta,
+    apply_rollup_delta,
+    apply_rollup_deltas,
+    net_bucket_deltas,
+)
+from app.utils.stats_cache import StatsDelta
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
+# Upper bound on creates + updates + deletes in one POST /expenses/bulk
+BULK_MAX_ITEMS = 500
+
+# Filter totals are keyed by data version, so they only need to outlive a session
+EXPENSE_TOTALS_TTL = 86400
+
+# Columns behind each ExpenseRead field. Listings select just these and build
+# plain dicts, skipping ORM hydration and response_model validation
+EXPENSE_COLUMNS = {
+    "id": Expense.id,
+    "user_id": Expense.user_id,
+    "amount": Expense.amount,
+    "description": Expense.description,
+    "date": Expense.date,
+    "category_id": Expense.category_id,
+}
+CATEGORY_COLUMNS = {
+    "id": Category.id,
+    "user_id": Category.user_id,
+    "name": Category.name,
+    "color": Category.color,
+    "icon": Category.icon,
+}
+EXPENSE_FIELDS = (*EXPENSE_COLUMNS, "category")
+
+
+def _parse_fields(fields: Optional[str]) -> list[str]:
+    if not fields:
+        return list(EXPENSE_FIELDS)
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(selected) - set(EXPENSE_FIELDS)
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a comma-separated subset of: {', '.join(EXPENSE_FIELDS)}",
+        )
+    # Keep the canonical order; drop duplicates
+    return [f for f in EXPENSE_FIELDS if f in selected]
+
+
+def _apply_filters(stmt, user_id: int, filters: dict, terms: list[str], dialect: str):
+    """
+    Restrict a select over expenses to the listing filters.
+    Returns the statement and the search ranking (None without a search).
+    """
+    stmt = stmt.filter(Expense.user_id == user_id)
+    if filters["from_date"]:
+        stmt = stmt.filter(Expense.date >= filters["from_date"])
+    if filters["to_date"]:
+        stmt = stmt.filter(Expense.date <= filters["to_date"])
+    if filters["min_amount"]:
+        stmt = stmt.filter(Expense.amount >= filters["min_amount"])
+    if filters["max_amount"]:
+        stmt = stmt.filter(Expense.amount <= filters["max_amount"])
+    if filters["category_id"]:
+        stmt = stmt.filter(Expense.category_id == filters["category_id"])
+    if terms:
+        return apply_description_search(stmt, terms, dialect)
+    return stmt, None
+
+
+async def _filtered_totals(
+    db: AsyncSession,
+    user_id: int,
+    generation: Optional[int],
+    version: Optional[int],
+    filters: dict,
+    terms: list[str],
+) -> tuple[int, str]:
+    """
+    (count, sum of amounts) of every expense matching the filters, from one
+    aggregate query. Cached per filter set and data version, so repeated
+    pages of the same listing reuse it until the user's data changes.
+    """
+    cache_key = None
+    if generation is not None and version is not None:
+        scope = repr((sorted(filters.items()), terms)).encode()
+        digest = hashlib.blake2b(scope, digest_size=8).hexdigest()
+        cache_key = redis_client.user_key(user_id, generation, "totals", f"v{version}", digest)
+        cached = await redis_client.get_cache(cache_key)
+        if cached:
+            return cached[0], cached[1]
+
+    stmt = select(func.count(), func.coalesce(func.sum(Expense.amount), 0)).select_from(Expense)
+    stmt, _ = _apply_filters(stmt, user_id, filters, terms, db.bind.dialect.name)
+    count, total = (await db.execute(stmt)).one()
+    totals = (count, f"{total:.2f}")
+
+    if cache_key:
+        await redis_client.set_cache(cache_key, list(totals), ttl=EXPENSE_TOTALS_TTL)
+    return totals
+
+
 @router.get("/", response_model=List[ExpenseRead])
-def list_expenses(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_expenses(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     from_date: date | None = Query(None),
     to_date: date | None = Query(None),
     min_amount: float | None = Query(None),
     max_amount: float | None = Query(None),
     category_id: int | None = Query(None),
+    q: str | None = Query(None, max_length=200, description="Search descriptions; results are ranked by relevance"),
+    fields: str | None = Query(None, description="Comma-separated ExpenseRead fields to return, e.g. id,amount,date"),
+    totals: bool = Query(False, description="Add X-Total-Count / X-Total-Amount for the whole filtered set"),
 ):
-    q = db.query(Expense).filter(Expense.user_id == current_user.id)
-
-    if from_date:
-        q = q.filter(Expense.date >= from_date)
-    if to_date:
-        q = q.filter(Expense.date <= to_date)
-    if min_amount:
-        q = q.filter(Expense.amount >= min_amount)
-    if max_amount:
-        q = q.filter(Expense.amount <= max_amount)
-    if category_id:
-        q = q.filter(Expense.category_id == category_id)
-
-    # Order by date desc, then created_at desc
-    q = q.order_by(desc(Expense.date), desc(Expense.created_at))
-    return q.offset(skip).limit(limit).all()
+    """
+    List expenses, newest first. Each page returns an X-Next-Cursor header
+    (when more rows may follow); pass it back as `cursor` to fetch the next
+    page at constant cost, instead of deep `skip` offsets.
+    With `q`, only expenses whose description contains every word of it (as
+    a prefix) are listed, best match first; such results page with `skip`.
+    `fields` trims each item to the given fields (sparse responses).
+    `totals` adds the count and sum of all matching expenses as headers.
+    """
+    selected = _parse_fields(fields)
+    terms = search_terms(q) if q else []
+    if terms and cursor:
+        raise HTTPException(status_code=400, detail="cursor cannot be combined with q")
+
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    filters = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "category_id": category_id,
+    }
+    # Read the versions before any data (see invalidations.versions, make_etag)
+    generation, version = await invalidations.versions(current_user.id)
+    etag = make_etag(
+        version, current_user.id, "expenses",
+        skip, limit, cursor, *filters.values(), terms, selected, totals,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    expense_fields = [f for f in selected if f in EXPENSE_COLUMNS]
+    with_category = "category" in selected
+    columns = [EXPENSE_COLUMNS[f] for f in expense_fields]
+    if with_category:
+        columns += CATEGORY_COLUMNS.values()
+    # The cursor is built from the last row, whatever fields were asked for
+    columns += [Expense.date, Expense.created_at, Expense.id]
+
+    stmt = select(*columns).select_from(Expense)
+    if with_category:
+        stmt = stmt.outerjoin(Category, Expense.category_id == Category.id)
+    stmt, rank = _apply_filters(stmt, current_user.id, filters, terms, db.bind.dialect.name)
+
+    # Newest first; id breaks ties so the order is total and the cursor exact.
+    # Served by ix_expenses_user_date_created_id
+    order = [desc(Expense.date), desc(Expense.created_at), desc(Expense.id)]
+    if rank is not None:
+        order.insert(0, rank)
+    if after:
+        stmt = stmt.filter(tuple_(Expense.date, Expense.created_at, Expense.id) < after)
+    else:
+        stmt = stmt.offset(skip)
+    stmt = stmt.order_by(*order).limit(limit)
+    rows = (await db.execute(stmt)).all()
+
+    n = len(expense_fields)
+    category_fields = tuple(CATEGORY_COLUMNS)
+    items = []
+    for row in rows:
+        item = dict(zip(expense_fields, row[:n]))
+        if with_category:
+            # An outer join without a match yields all-NULL category columns
+            item["category"] = (
+                dict(zip(category_fields, row[n:n + len(category_fields)]))
+                if row[n] is not None else None
+            )
+        items.append(item)
+
+    headers = etag_headers(etag)
+    if not terms and rows and len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(*rows[-1][-3:])
+    if totals:
+        count, amount = await _filtered_totals(
+            db, current_user.id, generation, version, filters, terms
+        )
+        headers["X-Total-Count"] = str(count)
+        headers["X-Total-Amount"] = amount
+    return Response(content=redis_client.dumps(items), media_type="application/json", headers=headers)
+
+async def _expense_read(db: AsyncSession, row) -> dict:
+    """
+    ExpenseRead fields of a row returned by a write, with its category.
+    """
+    item = {field: row[field] for field in EXPENSE_COLUMNS}
+    item["category"] = None
+    if item["category_id"] is not None:
+        category = (await db.execute(
+            select(*CATEGORY_COLUMNS.values()).where(Category.id == item["category_id"])
+        )).first()
+        if category is not None:
+            item["category"] = dict(zip(CATEGORY_COLUMNS, category))
+    return item
 
 async def invalidate_user_cache(user_id: int):
     """
-    Invalidate ALL stats cache for a user.
+    Invalidate ALL stats cache for a user, and bump the data version
+    (deferred, see app.utils.invalidation).
     """
-    # Pattern: user:{user_id}:* covers:
-    # user:{id}:dashboard_stats
-    # user:{id}:monthly:*
-    # user:{id}:category:*
-    # user:{id}:daily:*
-    await redis_client.delete_pattern(f"user:{user_id}:*")
+    # Every stats key embeds the user's generation (user:{id}:g{gen}:*),
+    # so one INCR orphans them all without scanning the keyspace:
+    # user:{id}:g{gen}:summary:*
+    # user:{id}:g{gen}:monthly:*
+    # user:{id}:g{gen}:category:*
+    # user:{id}:g{gen}:daily:*
+    # user:{id}:g{gen}:dashboard:*
+    await invalidations.schedule(user_id, full=True)
 
 @router.post("/", response_model=ExpenseRead, status_code=201)
 async def create_expense(
     expense_in: ExpenseCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: IdempotencyKey | None = Depends(get_idempotency_key),
 ):
+    if idempotency is not None:
+        replay = await idempotency.claim(expense_in.model_dump_json())
+        if replay is not None:
+            return replay
+
     expense = Expense(
         user_id=current_user.id,
         category_id=expense_in.category_id,
@@ -67,61 +279,222 @@ async def create_expense(
         amount=expense_in.amount,
         description=expense_in.description,
     )
+    expense.change_seq = await changes.next_change_seq(db, current_user.id)
     db.add(expense)
-    db.commit()
-    db.refresh(expense)
+    await db.run_sync(apply_rollup_delta, current_user.id, expense.date, expense.category_id, expense.amount, 1)
+    await db.commit()
+    await db.refresh(expense, ["category"])
+    if idempotency is not None:
+        await idempotency.save(201, ExpenseRead.model_validate(expense).model_dump(mode="json"))
     
-    # Batch Invalidate
-    await invalidate_user_cache(current_user.id)
+    # Keep cached stats warm
+    await invalidations.schedule(current_user.id, [
+        StatsDelta(expense.date, expense.category_id, float(expense.amount), 1),
+    ])
     
     return expense
 
+@router.post("/bulk", response_model=ExpenseBulkResponse)
+async def bulk_expenses(
+    batch: ExpenseBulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Apply a batch of creates, updates and deletes (in that order) in one
+    transaction, e.g. entries recorded offline. Updates and deletes of
+    unknown ids are reported as "not_found" without failing the batch.
+    Caches are patched and the data version bumped once for the whole batch.
+    """
+    uid = current_user.id
+    if len(batch.create) + len(batch.update) + len(batch.delete) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per batch")
+
+    # (day, category_id) -> (amount, count), applied to rollups and cached stats once
+    bucket_deltas: dict = {}
+
+    seq = await changes.next_change_seq(db, uid)
+    now = datetime.utcnow()
+
+    # Current state of every row the batch touches, in one query
+    target_ids = {item.id for item in batch.update} | set(batch.delete)
+    rows = {}
+    if target_ids:
+        result = await db.execute(
+            select(Expense.id, Expense.date, Expense.category_id, Expense.amount, Expense.description)
+            .where(Expense.user_id == uid, Expense.id.in_(target_ids))
+        )
+        rows = {row.id: row._asdict() for row in result}
+
+    results: list[dict] = []
+
+    created_ids = []
+    if batch.create:
+        values = [{**item.model_dump(), "user_id": uid, "change_seq": seq} for item in batch.create]
+        created_ids = (await db.scalars(
+            insert(Expense).returning(Expense.id, sort_by_parameter_order=True), values
+        )).all()
+        for index, (item, expense_id) in enumerate(zip(batch.create, created_ids)):
+            add_bucket_delta(bucket_deltas, item.date, item.category_id, float(item.amount), 1)
+            results.append({"op": "create", "index": index, "id": expense_id, "status": "ok"})
+
+    updated = {}
+    for index, item in enumerate(batch.update):
+        row = rows.get(item.id)
+        if row is None:
+            results.append({"op": "update", "index": index, "id": item.id, "status": "not_found"})
+            continue
+        add_bucket_delta(bucket_deltas, row["date"], row["category_id"], -float(row["amount"]), -1)
+        row.update(item.model_dump(exclude_unset=True, exclude={"id"}), change_seq=seq, updated_at=now)
+        add_bucket_delta(bucket_deltas, row["date"], row["category_id"], float(row["amount"]), 1)
+        updated[item.id] = row
+        results.append({"op": "update", "index": index, "id": item.id, "status": "ok"})
+    if updated:
+        # ORM bulk UPDATE by primary key: one executemany
+        await db.execute(update(Expense), list(updated.values()))
+
+    deleted_ids = set()
+    for index, expense_id in enumerate(batch.delete):
+        row = rows.get(expense_id)
+        if row is None or expense_id in deleted_ids:
+            results.append({"op": "delete", "index": index, "id": expense_id, "status": "not_found"})
+            continue
+        add_bucket_delta(bucket_deltas, row["date"], row["category_id"], -float(row["amount"]), -1)
+        deleted_ids.add(expense_id)
+        results.append({"op": "delete", "index": index, "id": expense_id, "status": "ok"})
+    if deleted_ids:
+        await db.execute(
+            delete(Expense)
+            .where(Expense.user_id == uid, Expense.id.in_(deleted_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await changes.add_tombstones(db, uid, changes.EXPENSE, deleted_ids, seq)
+
+    bucket_deltas = net_bucket_deltas(bucket_deltas)
+    await db.run_sync(apply_rollup_deltas, uid, bucket_deltas)
+    await db.commit()
+
+    # Return created and updated rows (that were not deleted later in the batch)
+    returned_ids = (set(created_ids) | set(updated)) - deleted_ids
+    expenses = {}
+    if returned_ids:
+        expenses = {
+            e.id: e for e in (await db.scalars(
+                select(Expense)
+                .where(Expense.id.in_(returned_ids))
+                .options(selectinload(Expense.category))
+            )).all()
+        }
+    for r in results:
+        if r["status"] == "ok" and r["op"] != "delete":
+            r["expense"] = expenses.get(r["id"])
+
+    if created_ids or updated or deleted_ids:
+        await invalidations.schedule(uid, [
+            StatsDelta(day, category_id, amount, count)
+            for (day, category_id), (amount, count) in bucket_deltas.items()
+        ])
+
+    return {"results": results}
+
 @router.put("/{expense_id}", response_model=ExpenseRead)
 async def update_expense(
     expense_id: int,
     expense_in: ExpenseUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    expense = (
-        db.query(Expense)
-        .filter(Expense.id == expense_id, Expense.user_id == current_user.id)
-        .first()
-    )
-    if not expense:
+    uid = current_user.id
+    owned = (Expense.id == expense_id, Expense.user_id == uid)
+    values = expense_in.model_dump(exclude_unset=True)
+    values["change_seq"] = await changes.next_change_seq(db, uid)
+
+    if db.bind.dialect.name == "postgresql":
+        # One statement: the CTE locks the row and hands its old values to RETURNING
+        old = (
+            select(Expense.id, Expense.date, Expense.category_id, Expense.amount)
+            .where(*owned)
+            .with_for_update()
+            .cte("old")
+        )
+        result = await db.execute(
+            update(Expense)
+            .where(Expense.id == old.c.id)
+            .values(values)
+            .returning(
+                *EXPENSE_COLUMNS.values(),
+                old.c.date.label("old_date"),
+                old.c.category_id.label("old_category_id"),
+                old.c.amount.label("old_amount"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = result.mappings().first()
+    else:
+        # SQLite's RETURNING cannot see other tables: read the old values first
+        old = (await db.execute(
+            select(
+                Expense.date.label("old_date"),
+                Expense.category_id.label("old_category_id"),
+                Expense.amount.label("old_amount"),
+            ).where(*owned)
+        )).mappings().first()
+        row = None
+        if old is not None:
+            result = await db.execute(
+                update(Expense)
+                .where(*owned)
+                .values(values)
+                .returning(*EXPENSE_COLUMNS.values())
+                .execution_options(synchronize_session=False)
+            )
+            row = {**result.mappings().one(), **old}
+    if row is None:
         raise HTTPException(status_code=404, detail="Expense not found")
+
+    # Move the amount between rollup buckets
+    if (row["old_date"], row["old_category_id"]) == (row["date"], row["category_id"]):
+        amount_delta = float(row["amount"]) - float(row["old_amount"])
+        deltas = [StatsDelta(row["date"], row["category_id"], amount_delta, 0)]
+    else:
+        deltas = [
+            StatsDelta(row["old_date"], row["old_category_id"], -float(row["old_amount"]), -1),
+            StatsDelta(row["date"], row["category_id"], float(row["amount"]), 1),
+        ]
+    for d in deltas:
+        await db.run_sync(apply_rollup_delta, uid, d.day, d.category_id, d.amount, d.count)
+
+    await db.commit()
     
-    update_data = expense_in.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(expense, key, value)
-    
-    db.add(expense)
-    db.commit()
-    db.refresh(expense)
-    
-    # Batch Invalidate
-    await invalidate_user_cache(current_user.id)
+    # Keep cached stats warm
+    await invalidations.schedule(uid, deltas)
     
-    return expense
+    return await _expense_read(db, row)
 
 @router.delete("/{expense_id}")
 async def delete_expense(
     expense_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    expense = (
-        db.query(Expense)
-        .filter(Expense.id == expense_id, Expense.user_id == current_user.id)
-        .first()
-    )
-    if not expense:
+    uid = current_user.id
+    seq = await changes.next_change_seq(db, uid)
+    row = (await db.execute(
+        delete(Expense)
+        .where(Expense.id == expense_id, Expense.user_id == uid)
+        .returning(Expense.date, Expense.category_id, Expense.amount)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Expense not found")
     
-    db.delete(expense)
-    db.commit()
+    delta = StatsDelta(row.date, row.category_id, -float(row.amount), -1)
+
+    await db.run_sync(apply_rollup_delta, uid, delta.day, delta.category_id, delta.amount, delta.count)
+    await changes.add_tombstones(db, uid, changes.EXPENSE, [expense_id], seq)
+    await db.commit()
     
-    # Batch Invalidate
-    await invalidate_user_cache(current_user.id)
+    # Keep cached stats warm
+    await invalidations.schedule(uid, [delta])
     
     return {"message": "Expense deleted successfully"}
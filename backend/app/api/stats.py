@@ -1,15 +1,22 @@
+from calendar import monthrange
 from datetime import date
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
-from fastapi import APIRouter, Depends, Query, Response
-from sqlalchemy import func, extract
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, Response
+from pydantic import BaseModel
+from sqlalchemy import func, extract, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db, get_async_db
+from app.core.metrics import observe_cache
 from app.models.expense import Expense
 from app.models.category import Category
+from app.models.rollup import ExpenseDailyRollup
 from app.models.user import User
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_user_async
 from app.schemas.stats import (
     SummaryStats,
     MonthlyStats,
@@ -18,99 +25,155 @@ from app.schemas.stats import (
     DailyPoint,
     CategoryStats,
     CategoryPoint,
+    DashboardStats,
 )
-import time
+from app.utils.invalidation import invalidations
 from app.utils.redis_client import redis_client
+from app.utils.dates import MAX_YEAR, MIN_YEAR, month_range, year_range
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.utils.single_flight import single_flight, compute_with_lock, refresh_with_lock
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
-# In-Memory Cache (Simple implementation for demonstration) - DEPRECATED via Redis
-CACHE = {}
+# Stats keys are invalidated through the user's generation, not by expiry
+STATS_CACHE_TTL = 604800
 
-def get_cached(key: str, ttl: int = 60):
-    if key in CACHE:
-        val, ts = CACHE[key]
-        if time.time() - ts < ttl:
-            return val
-    return None
 
-def set_cached(key: str, val: any):
-    CACHE[key] = (val, time.time())
+def _serialize(view: BaseModel) -> bytes:
+    return redis_client.dumps(view.model_dump())
 
 
-def _get_year_month_or_default(year: Optional[int], month: Optional[int]) -> tuple[int, Optional[int]]:
-    today = date.today()
-    y = year or today.year
-    m = month or today.month
-    return y, m
+def _json_response(payload: bytes, cache_status: str, etag: Optional[str]) -> Response:
+    # Cached payloads are already valid JSON for the response model:
+    # send them without parsing, revalidating and re-encoding
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers={"X-Cache": cache_status, **etag_headers(etag)},
+    )
 
 
-@router.get("/summary", response_model=SummaryStats)
-async def summary_stats(
-    response: Response,
-    year: int | None = Query(None),
-    month: int | None = Query(None),
-    _t: int | None = Query(None),  # Accept timestamp for cache busting
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def _refresh_view(
+    cache_key: str,
+    compute: Callable[[AsyncSession], Awaitable[BaseModel]],
 ):
+    # Runs after the response: the request's session is already closed
+    async def compute_payload() -> bytes:
+        async with AsyncSessionLocal() as db:
+            return _serialize(await compute(db))
+
+    await refresh_with_lock(
+        cache_key,
+        compute_payload,
+        ttl=STATS_CACHE_TTL,
+        soft_ttl=settings.STATS_CACHE_SOFT_TTL_SECONDS,
+    )
+
+
+async def _cached_view(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession,
+    user_id: int,
+    parts: tuple,
+    compute: Callable[[AsyncSession], Awaitable[BaseModel]],
+) -> Any:
     """
-    Summary for a given month (default: current month).
+    Serve the stats view identified by `parts` (e.g. ("daily", 2025, 1)).
+    A client whose ETag is current gets a 304 without any cache or database
+    work. Otherwise the view comes from cache, computed at most once on a
+    miss: concurrent requests in this process share one computation, and a
+    Redis lock keeps other workers from recomputing the same key.
+    A view past its soft TTL is served as-is and refreshed in the background.
     """
-    # Cache Logic: Only cache the default view (current month/year) to match the strict key requirement
-    use_cache = (year is None and month is None)
-    cache_key = f"user:{current_user.id}:dashboard_stats"
+    # Both counters in one round trip (usually served by the local cache)
+    generation, version = await invalidations.versions(user_id)
+
+    family = parts[0]
+    etag = make_etag(version, user_id, "stats", *parts)
+    if etag_matches(request, etag):
+        observe_cache(family, "not_modified")
+        return not_modified(etag)
+
+    if generation is None:
+        observe_cache(family, "bypass")
+        return await compute(db)
+    cache_key = redis_client.user_key(user_id, generation, *parts)
+
+    entry = await redis_client.get_raw(cache_key)
+    if entry:
+        payload, stale = entry
+        if stale:
+            background_tasks.add_task(_refresh_view, cache_key, compute)
+        observe_cache(family, "stale" if stale else "hit")
+        return _json_response(payload, "STALE" if stale else "HIT", etag)
+
+    async def compute_payload() -> bytes:
+        return _serialize(await compute(db))
+
+    observe_cache(family, "miss")
+    payload = await single_flight.do(
+        cache_key,
+        lambda: compute_with_lock(
+            cache_key,
+            compute_payload,
+            ttl=STATS_CACHE_TTL,
+            soft_ttl=settings.STATS_CACHE_SOFT_TTL_SECONDS,
+            guard_keys=redis_client.version_keys(user_id),
+        ),
+    )
+    return _json_response(payload, "MISS", etag)
 
-    if use_cache:
-        cached = await redis_client.get_cache(cache_key)
-        if cached:
-            response.headers["X-Cache"] = "HIT"
-            return cached
 
-    y, m = _get_year_month_or_default(year, month)
+def _get_year_month_or_default(year: Optional[int], month: Optional[int]) -> tuple[int, Optional[int]]:
+    today = date.today()
+    y = year or today.year
+    m = month or today.month
+    return y, m
 
-    q = db.query(Expense).filter(Expense.user_id == current_user.id)
-    q = q.filter(func.extract("year", Expense.date) == y)
-    if m:
-        q = q.filter(func.extract("month", Expense.date) == m)
 
-    total_spent = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-        Expense.user_id == current_user.id,
-        func.extract("year", Expense.date) == y,
-        func.extract("month", Expense.date) == m,
-    ).scalar() or 0
+async def _compute_summary(db: AsyncSession, user_id: int, y: int, m: int) -> SummaryStats:
+    start, end = month_range(y, m)
 
-    tx_count = q.count()
+    # Totals come from the pre-aggregated daily rollups (<= 31 x categories rows)
+    totals = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0),
+                func.coalesce(func.sum(ExpenseDailyRollup.count), 0),
+            ).where(
+                ExpenseDailyRollup.user_id == user_id,
+                ExpenseDailyRollup.day >= start,
+                ExpenseDailyRollup.day < end,
+            )
+        )
+    ).one()
+    total_spent = totals[0] or 0
+    tx_count = int(totals[1] or 0)
 
     # avg per day in that month
-    if m:
-        from calendar import monthrange
-
-        days_in_month = monthrange(y, m)[1]
-    else:
-        days_in_month = 365
-
+    days_in_month = monthrange(y, m)[1] if m else 365
     avg_per_day = float(total_spent) / days_in_month if days_in_month else 0.0
 
     # top category
     cat_row = (
-        db.query(
-            Category.name,
-            func.coalesce(func.sum(Expense.amount), 0).label("total"),
+        await db.execute(
+            select(
+                Category.name,
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
+            )
+            .join(ExpenseDailyRollup, ExpenseDailyRollup.category_id == Category.id)
+            .filter(ExpenseDailyRollup.user_id == user_id)
+            .filter(ExpenseDailyRollup.day >= start, ExpenseDailyRollup.day < end)
+            .group_by(Category.id)
+            .order_by(func.sum(ExpenseDailyRollup.total).desc())
         )
-        .join(Expense, Expense.category_id == Category.id, isouter=True)
-        .filter(Expense.user_id == current_user.id)
-        .filter(func.extract("year", Expense.date) == y)
-        .filter(func.extract("month", Expense.date) == m)
-        .group_by(Category.id)
-        .order_by(func.sum(Expense.amount).desc())
-        .first()
-    )
+    ).first()
 
     top_cat = cat_row[0] if cat_row else None
     top_cat_amt = float(cat_row[1]) if cat_row else 0.0
 
-    result = SummaryStats(
+    return SummaryStats(
         period="month",
         year=y,
         month=m,
@@ -121,46 +184,22 @@ async def summary_stats(
         top_category_amount=top_cat_amt,
     )
 
-    if use_cache:
-        await redis_client.set_cache(cache_key, result.dict(), ttl=604800)
-        response.headers["X-Cache"] = "MISS"
-
-    return result
-
-
-@router.get("/monthly", response_model=MonthlyStats)
-async def monthly_stats(
-    response: Response,
-    year: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Total spent per month of a given year (default: current year).
-    """
-    # Cache Logic
-    y = year or date.today().year
-    cache_key = f"user:{current_user.id}:monthly:{y}"
-    
-    cached = await redis_client.get_cache(cache_key)
-    if cached:
-        response.headers["X-Cache"] = "HIT"
-        return cached
 
-    today = date.today()
-    # y already set above
+async def _compute_monthly(db: AsyncSession, user_id: int, y: int) -> MonthlyStats:
+    start, end = year_range(y)
 
     rows = (
-        db.query(
-            func.extract("month", Expense.date).label("month"),
-            func.coalesce(func.sum(Expense.amount), 0).label("total"),
+        await db.execute(
+            select(
+                func.extract("month", ExpenseDailyRollup.day).label("month"),
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
+            )
+            .filter(ExpenseDailyRollup.user_id == user_id)
+            .filter(ExpenseDailyRollup.day >= start, ExpenseDailyRollup.day < end)
+            .group_by(func.extract("month", ExpenseDailyRollup.day))
+            .order_by("month")
         )
-        .filter(Expense.user_id == current_user.id)
-        .filter(func.extract("year", Expense.date) == y)
-        .group_by(func.extract("month", Expense.date))
-        .order_by("month")
-        .all()
-    )
+    ).all()
 
     points = [
         MonthlyPoint(
@@ -169,61 +208,37 @@ async def monthly_stats(
         )
         for row in rows
     ]
-    
-    result = MonthlyStats(year=y, points=points)
-    
-    await redis_client.set_cache(cache_key, result.dict(), ttl=604800)
-    response.headers["X-Cache"] = "MISS"
 
-    return result
+    return MonthlyStats(year=y, points=points)
 
 
-@router.get("/categories", response_model=CategoryStats)
-async def categories_stats(
-    response: Response,
-    year: int | None = Query(None),
-    month: int | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Total spent per category for given year/month.
-    """
-    # Cache Logic
-    y, m = _get_year_month_or_default(year, month)
-    # Key: user:{uid}:category:{year}:{month} (month can be None)
-    month_key = m if m else "all"
-    cache_key = f"user:{current_user.id}:category:{y}:{month_key}"
-    
-    cached = await redis_client.get_cache(cache_key)
-    if cached:
-        response.headers["X-Cache"] = "HIT"
-        return cached
+async def _compute_categories(
+    db: AsyncSession, user_id: int, y: int, m: Optional[int]
+) -> CategoryStats:
+    start, end = month_range(y, m) if m else year_range(y)
 
     q = (
-        db.query(
-            Expense.category_id,
-            func.coalesce(func.sum(Expense.amount), 0).label("total"),
+        select(
+            ExpenseDailyRollup.category_id,
+            func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
         )
-        .filter(Expense.user_id == current_user.id)
-        .filter(func.extract("year", Expense.date) == y)
+        .filter(ExpenseDailyRollup.user_id == user_id)
+        .filter(ExpenseDailyRollup.day >= start, ExpenseDailyRollup.day < end)
     )
 
-    if m:
-        q = q.filter(func.extract("month", Expense.date) == m)
-
-    q = q.group_by(Expense.category_id)
+    q = q.group_by(ExpenseDailyRollup.category_id)
 
-    rows = q.all()
+    rows = (await db.execute(q)).all()
 
     # Map category ids → names
     cat_ids = [r.category_id for r in rows if r.category_id is not None]
     categories = (
-        db.query(Category.id, Category.name)
-        .filter(Category.user_id == current_user.id)
-        .filter(Category.id.in_(cat_ids) if cat_ids else False)
-        .all()
-    )
+        await db.execute(
+            select(Category.id, Category.name)
+            .filter(Category.user_id == user_id)
+            .filter(Category.id.in_(cat_ids) if cat_ids else False)
+        )
+    ).all()
     cat_map = {c.id: c.name for c in categories}
 
     points: list[CategoryPoint] = []
@@ -237,59 +252,29 @@ async def categories_stats(
             )
         )
 
-    result = CategoryStats(year=y, month=m, categories=points)
-    
-    await redis_client.set_cache(cache_key, result.dict(), ttl=604800)
-    response.headers["X-Cache"] = "MISS"
-    
-    return result
-
+    return CategoryStats(year=y, month=m, categories=points)
 
-@router.get("/daily", response_model=DailyStats)
-async def daily_stats(
-    response: Response,
-    year: int | None = Query(None),
-    month: int | None = Query(None),
-    _t: int | None = Query(None),  # Accept timestamp for cache busting
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Daily spending breakdown for a specific month.
-    """
-    # Cache Logic
-    y, m = _get_year_month_or_default(year, month)
-    
-    # Ensure month is set for daily stats, defaults to current if not provided
-    if not m:
-        today = date.today()
-        m = today.month
 
-    cache_key = f"user:{current_user.id}:daily:{y}:{m}"
-    
-    cached = await redis_client.get_cache(cache_key)
-    if cached:
-        response.headers["X-Cache"] = "HIT"
-        return cached
+async def _compute_daily(db: AsyncSession, user_id: int, y: int, m: int) -> DailyStats:
+    start, end = month_range(y, m)
 
     rows = (
-        db.query(
-            func.extract("day", Expense.date).label("day"),
-            func.coalesce(func.sum(Expense.amount), 0).label("total"),
+        await db.execute(
+            select(
+                func.extract("day", ExpenseDailyRollup.day).label("day"),
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
+            )
+            .filter(ExpenseDailyRollup.user_id == user_id)
+            .filter(ExpenseDailyRollup.day >= start, ExpenseDailyRollup.day < end)
+            .group_by(func.extract("day", ExpenseDailyRollup.day))
+            .order_by("day")
         )
-        .filter(Expense.user_id == current_user.id)
-        .filter(func.extract("year", Expense.date) == y)
-        .filter(func.extract("month", Expense.date) == m)
-        .group_by(func.extract("day", Expense.date))
-        .order_by("day")
-        .all()
-    )
+    ).all()
 
     # Convert to dictionary for easy lookup
     data_map = {int(r.day): float(r.total) for r in rows}
 
     points = []
-    from calendar import monthrange
     days_in_month = monthrange(y, m)[1]
 
     for d in range(1, days_in_month + 1):
@@ -301,13 +286,262 @@ async def daily_stats(
             )
         )
 
-    result = DailyStats(year=y, month=m, points=points)
-    
-    await redis_client.set_cache(cache_key, result.dict(), ttl=604800)
-    response.headers["X-Cache"] = "MISS"
+    return DailyStats(year=y, month=m, points=points)
+
 
+async def _compute_dashboard(db: AsyncSession, user_id: int, y: int, m: int) -> DashboardStats:
+    start, end = month_range(y, m)
+    year_start, year_end = year_range(y)
+
+    # 1. Month: day x category buckets (names resolved in the same query)
+    month_rows = (
+        await db.execute(
+            select(
+                ExpenseDailyRollup.day,
+                ExpenseDailyRollup.category_id,
+                Category.name.label("category_name"),
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
+                func.coalesce(func.sum(ExpenseDailyRollup.count), 0).label("count"),
+            )
+            .outerjoin(Category, Category.id == ExpenseDailyRollup.category_id)
+            .filter(ExpenseDailyRollup.user_id == user_id)
+            .filter(ExpenseDailyRollup.day >= start, ExpenseDailyRollup.day < end)
+            .group_by(ExpenseDailyRollup.day, ExpenseDailyRollup.category_id, Category.name)
+        )
+    ).all()
+
+    # 2. Year: month totals
+    year_rows = (
+        await db.execute(
+            select(
+                func.extract("month", ExpenseDailyRollup.day).label("month"),
+                func.coalesce(func.sum(ExpenseDailyRollup.total), 0).label("total"),
+            )
+            .filter(ExpenseDailyRollup.user_id == user_id)
+            .filter(ExpenseDailyRollup.day >= year_start, ExpenseDailyRollup.day < year_end)
+            .group_by(func.extract("month", ExpenseDailyRollup.day))
+            .order_by("month")
+        )
+    ).all()
+
+    day_totals: dict[int, float] = {}
+    cat_totals: dict[int | None, float] = {}
+    cat_names: dict[int | None, str | None] = {}
+    total_spent = 0.0
+    tx_count = 0
+
+    for r in month_rows:
+        amount = float(r.total)
+        total_spent += amount
+        tx_count += int(r.count)
+        day_totals[r.day.day] = day_totals.get(r.day.day, 0.0) + amount
+        cat_totals[r.category_id] = cat_totals.get(r.category_id, 0.0) + amount
+        cat_names[r.category_id] = r.category_name
+
+    # Summing floats in Python drifts; totals are NUMERIC(.., 2) values
+    total_spent = round(total_spent, 2)
+    day_totals = {d: round(v, 2) for d, v in day_totals.items()}
+    cat_totals = {cid: round(v, 2) for cid, v in cat_totals.items()}
+
+    days_in_month = monthrange(y, m)[1]
+
+    # Top category ignores uncategorized spend, same as /summary
+    named = [(cid, amt) for cid, amt in cat_totals.items() if cid is not None and cat_names.get(cid)]
+    top_cid, top_amt = max(named, key=lambda item: item[1]) if named else (None, 0.0)
+
+    summary = SummaryStats(
+        period="month",
+        year=y,
+        month=m,
+        total_spent=total_spent,
+        avg_per_day=total_spent / days_in_month if days_in_month else 0.0,
+        transactions_count=tx_count,
+        top_category=cat_names.get(top_cid) if top_cid is not None else None,
+        top_category_amount=top_amt,
+    )
+
+    daily = DailyStats(
+        year=y,
+        month=m,
+        points=[
+            DailyPoint(day=d, date=date(y, m, d), total_amount=day_totals.get(d, 0.0))
+            for d in range(1, days_in_month + 1)
+        ],
+    )
+
+    categories = CategoryStats(
+        year=y,
+        month=m,
+        categories=[
+            CategoryPoint(
+                category_id=cid,
+                category_name=cat_names.get(cid) if cid is not None else "Uncategorized",
+                total_amount=amt,
+            )
+            for cid, amt in cat_totals.items()
+        ],
+    )
+
+    monthly = MonthlyStats(
+        year=y,
+        points=[MonthlyPoint(month=int(r.month), total_amount=float(r.total)) for r in year_rows],
+    )
+
+    return DashboardStats(summary=summary, daily=daily, categories=categories, monthly=monthly)
+
+
+async def _compute_dashboard_from_views(
+    db: AsyncSession, user_id: int, y: int, m: int
+) -> DashboardStats:
+    """
+    Assemble the dashboard from the cached summary, daily, categories and
+    monthly views (one MGET) when all four are fresh. Otherwise compute it
+    and cache whichever of those views were missing (one pipelined write).
+    """
+    generation, _ = await invalidations.versions(user_id)
+    if generation is None:
+        return await _compute_dashboard(db, user_id, y, m)
+
+    keys = {
+        "summary": redis_client.user_key(user_id, generation, "summary", y, m),
+        "daily": redis_client.user_key(user_id, generation, "daily", y, m),
+        "categories": redis_client.user_key(user_id, generation, "category", y, m),
+        "monthly": redis_client.user_key(user_id, generation, "monthly", y),
+    }
+    cached = await redis_client.get_many_raw(list(keys.values()))
+    if all(key in cached and not cached[key][1] for key in keys.values()):
+        return DashboardStats(
+            **{part: orjson.loads(cached[key][0]) for part, key in keys.items()}
+        )
+
+    # As in compute_with_lock: don't cache views a concurrent write may miss
+    guards = await redis_client.get_stored_many(redis_client.version_keys(user_id))
+    result = await _compute_dashboard(db, user_id, y, m)
+    if guards is not None:
+        await redis_client.set_many_raw_if_guards_unchanged(
+            {
+                key: _serialize(getattr(result, part))
+                for part, key in keys.items()
+                if key not in cached
+            },
+            guards,
+            ttl=STATS_CACHE_TTL,
+            soft_ttl=settings.STATS_CACHE_SOFT_TTL_SECONDS,
+        )
     return result
 
+
+@router.get("/summary", response_model=SummaryStats)
+async def summary_stats(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    year: int | None = Query(None, ge=MIN_YEAR, le=MAX_YEAR),
+    month: int | None = Query(None, ge=1, le=12),
+    _t: int | None = Query(None),  # Accept timestamp for cache busting
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Summary for a given month (default: current month).
+    """
+    # Cache Logic: keys are per month, so any month can be cached
+    y, m = _get_year_month_or_default(year, month)
+    return await _cached_view(
+        request, background_tasks, db, current_user.id, ("summary", y, m),
+        lambda db: _compute_summary(db, current_user.id, y, m)
+    )
+
+
+@router.get("/monthly", response_model=MonthlyStats)
+async def monthly_stats(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    year: int | None = Query(None, ge=MIN_YEAR, le=MAX_YEAR),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Total spent per month of a given year (default: current year).
+    """
+    # Cache Logic
+    y = year or date.today().year
+    return await _cached_view(
+        request, background_tasks, db, current_user.id, ("monthly", y),
+        lambda db: _compute_monthly(db, current_user.id, y)
+    )
+
+
+@router.get("/categories", response_model=CategoryStats)
+async def categories_stats(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    year: int | None = Query(None, ge=MIN_YEAR, le=MAX_YEAR),
+    month: int | None = Query(None, ge=1, le=12),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Total spent per category for given year/month.
+    """
+    # Cache Logic
+    y, m = _get_year_month_or_default(year, month)
+    # Key: user:{uid}:g{gen}:category:{year}:{month} (month can be None)
+    month_key = m if m else "all"
+    return await _cached_view(
+        request, background_tasks, db, current_user.id, ("category", y, month_key),
+        lambda db: _compute_categories(db, current_user.id, y, m)
+    )
+
+
+@router.get("/daily", response_model=DailyStats)
+async def daily_stats(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    year: int | None = Query(None, ge=MIN_YEAR, le=MAX_YEAR),
+    month: int | None = Query(None, ge=1, le=12),
+    _t: int | None = Query(None),  # Accept timestamp for cache busting
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Daily spending breakdown for a specific month.
+    """
+    # Cache Logic
+    y, m = _get_year_month_or_default(year, month)
+
+    # Ensure month is set for daily stats, defaults to current if not provided
+    if not m:
+        today = date.today()
+        m = today.month
+
+    return await _cached_view(
+        request, background_tasks, db, current_user.id, ("daily", y, m),
+        lambda db: _compute_daily(db, current_user.id, y, m)
+    )
+
+
+@router.get("/dashboard", response_model=DashboardStats)
+async def dashboard_stats(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    year: int | None = Query(None, ge=MIN_YEAR, le=MAX_YEAR),
+    month: int | None = Query(None, ge=1, le=12),
+    _t: int | None = Query(None),  # Accept timestamp for cache busting
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Summary, daily, categories and monthly views in one response.
+    Assembled from those views when they are cached; otherwise built from
+    two grouped rollup queries: day x category for the month, and month
+    totals for the year.
+    """
+    y, m = _get_year_month_or_default(year, month)
+    return await _cached_view(
+        request, background_tasks, db, current_user.id, ("dashboard", y, m),
+        lambda db: _compute_dashboard_from_views(db, current_user.id, y, m)
+    )
+
 @router.get("/streak")
 def get_streak_data(
     db: Session = Depends(get_db),
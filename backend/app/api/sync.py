@@ -0,0 +1,309 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.schemas.sync import SyncChanges, SyncOp, SyncPushRequest, SyncPushResponse
+from app.api.deps import get_current_user_async
+from app.api.expenses import BULK_MAX_ITEMS
+from app.utils import changes
+from app.utils.invalidation import invalidations
+from app.utils.rollups import add_bucket_delta, apply_rollup_deltas, net_bucket_deltas
+from app.utils.stats_cache import StatsDelta
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+# Columns sent for each entity, matching the schemas in app.schemas.sync
+SYNC_COLUMNS = {
+    "expenses": (
+        Expense,
+        (Expense.id, Expense.client_id, Expense.amount, Expense.description, Expense.date,
+         Expense.category_id, Expense.created_at, Expense.updated_at),
+    ),
+    "categories": (
+        Category,
+        (Category.id, Category.name, Category.color, Category.icon, Category.updated_at),
+    ),
+    "budgets": (
+        Budget,
+        (Budget.id, Budget.amount, Budget.month, Budget.category_id, Budget.updated_at),
+    ),
+}
+
+TOMBSTONE_KEYS = {
+    changes.EXPENSE: "expenses",
+    changes.CATEGORY: "categories",
+    changes.BUDGET: "budgets",
+}
+
+# Expense fields an op can write
+PUSH_FIELDS = ("amount", "description", "date", "category_id")
+# Of those, the ones the row can't do without (NOT NULL columns)
+REQUIRED_FIELDS = ("amount", "date")
+
+
+def _parse_since(since: str | None) -> int | None:
+    if since is None:
+        return None
+    try:
+        value = int(since)
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return value
+
+
+@router.get("/changes", response_model=SyncChanges)
+async def sync_changes(
+    since: str | None = Query(None, description="token of the previous sync; omit for a full snapshot"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Expenses, categories and budgets written since `since`, and the ids of
+    those deleted since then. Without `since` every live row is returned.
+    The returned token is the sequence number the result is complete up to.
+    """
+    uid = current_user.id
+    since_seq = _parse_since(since)
+
+    # Read the high-water mark first: every change up to it is committed,
+    # later ones are left for the next call even if they land meanwhile
+    token = await db.scalar(select(User.change_seq).where(User.id == uid))
+    full = since_seq is None
+    if not full and since_seq > token:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    result = {"token": str(token), "full": full, "deleted": {}}
+    for key, (model, columns) in SYNC_COLUMNS.items():
+        stmt = select(*columns).where(model.user_id == uid, model.change_seq <= token)
+        if not full:
+            stmt = stmt.where(model.change_seq > since_seq)
+        rows = (await db.execute(stmt.order_by(model.id))).mappings().all()
+        result[key] = [dict(row) for row in rows]
+
+    if not full:
+        # A full snapshot already leaves deleted rows out
+        tombstones = await db.execute(
+            select(Tombstone.entity, Tombstone.entity_id)
+            .where(
+                Tombstone.user_id == uid,
+                Tombstone.change_seq > since_seq,
+                Tombstone.change_seq <= token,
+            )
+            .order_by(Tombstone.id)
+        )
+        deleted = {key: [] for key in TOMBSTONE_KEYS.values()}
+        for entity, entity_id in tombstones:
+            deleted[TOMBSTONE_KEYS[entity]].append(entity_id)
+        result["deleted"] = deleted
+
+    return result
+
+
+def _check_op(index: int, item: SyncOp):
+    if item.op == "create":
+        if item.client_id is None:
+            problem = "a create needs a client_id"
+        elif item.expense is None or item.expense.amount is None or item.expense.date is None:
+            problem = "a create needs expense.amount and expense.date"
+        else:
+            return
+    elif item.client_id is None and item.id is None:
+        problem = f"an {item.op} needs a client_id or an id"
+    elif item.op == "update" and item.expense is None:
+        problem = "an update needs expense fields"
+    else:
+        return
+    raise HTTPException(status_code=422, detail=f"ops[{index}]: {problem}")
+
+
+def _nulled_required_fields(item: SyncOp) -> list[str]:
+    """
+    Required fields an update explicitly sets to null.
+    """
+    return [
+        field for field in REQUIRED_FIELDS
+        if field in item.expense.model_fields_set and getattr(item.expense, field) is None
+    ]
+
+
+def _server_wins(item: SyncOp, row: dict) -> bool:
+    """
+    Whether an update or delete of an existing row loses to the server copy.
+    """
+    if item.base_version is not None and row["change_seq"] <= item.base_version:
+        return False  # not written since the client saw it
+    if item.on_conflict == "reject":
+        return item.base_version is not None
+    # Last writer wins: the server copy stays only if it was written after
+    # the edit was made. Without modified_at the push is the last writer.
+    if item.modified_at is None or row["updated_at"] is None:
+        return False
+    modified_at = item.modified_at
+    if modified_at.tzinfo is not None:
+        modified_at = modified_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return row["updated_at"] > modified_at
+
+
+@router.post("/push", response_model=SyncPushResponse)
+async def sync_push(
+    batch: SyncPushRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Replay a device's offline op log, in order, in one transaction.
+    Rows are addressed by the client_id given at creation (or by server id),
+    so ops can refer to rows created earlier in the same log and a create
+    that is pushed twice is applied once. Updates and deletes of rows written
+    since `base_version` are resolved per op: "reject" leaves the server copy,
+    "lww" keeps whichever write was made last. An update nulling a required
+    field is rejected on its own, without failing the push.
+    """
+    uid = current_user.id
+    if len(batch.ops) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} ops per push")
+    for index, item in enumerate(batch.ops):
+        _check_op(index, item)
+
+    # Taken before reading: it locks the user's row, so no row version
+    # read below can move before this transaction commits
+    seq = await changes.next_change_seq(db, uid)
+    now = datetime.utcnow()
+
+    # Current state of every row the log refers to, in one query
+    ids = {item.id for item in batch.ops if item.id is not None}
+    client_ids = {item.client_id for item in batch.ops if item.client_id is not None}
+    by_id: dict[int, dict] = {}
+    by_client_id: dict[str, dict] = {}
+    if ids or client_ids:
+        result = await db.execute(
+            select(*SYNC_COLUMNS["expenses"][1], Expense.change_seq)
+            .where(Expense.user_id == uid)
+            .where(or_(Expense.id.in_(ids), Expense.client_id.in_(client_ids)))
+        )
+        for row in result:
+            state = row._asdict()
+            by_id[state["id"]] = state
+            if state["client_id"] is not None:
+                by_client_id[state["client_id"]] = state
+
+    # (day, category_id) -> (amount, count), applied to rollups and cached stats once
+    bucket_deltas: dict = {}
+    created: list[dict] = []
+    updated: dict[int, dict] = {}
+    results: list[tuple[dict, dict | None]] = []
+
+    for index, item in enumerate(batch.ops):
+        outcome = {"index": index, "op": item.op, "client_id": item.client_id, "id": item.id}
+        state = None
+        if item.client_id is not None:
+            state = by_client_id.get(item.client_id)
+        if state is None and item.id is not None:
+            state = by_id.get(item.id)
+
+        if item.op == "create":
+            if state is None:
+                state = {
+                    "id": None,
+                    "client_id": item.client_id,
+                    **item.expense.model_dump(include=set(PUSH_FIELDS)),
+                    "created_at": now,
+                }
+                by_client_id[item.client_id] = state
+                created.append(state)
+                add_bucket_delta(bucket_deltas, state["date"], state["category_id"], float(state["amount"]), 1)
+            elif state.get("deleted"):
+                # Deleted earlier in this log: the create brings the row back,
+                # as a new row or, if it is already stored, by rewriting it
+                del state["deleted"]
+                state.update(item.expense.model_dump(include=set(PUSH_FIELDS)))
+                add_bucket_delta(bucket_deltas, state["date"], state["category_id"], float(state["amount"]), 1)
+                if state["id"] is not None:
+                    updated[state["id"]] = state
+            # else: already pushed once, keep the row as it is
+            outcome["status"] = "applied"
+        elif state is None or state.get("deleted"):
+            outcome["status"] = "not_found"
+        elif item.op == "update" and (nulled := _nulled_required_fields(item)):
+            outcome["status"] = "rejected"
+            outcome["detail"] = f"{', '.join(nulled)} cannot be null"
+        elif state["id"] is not None and _server_wins(item, state):
+            outcome["status"] = "conflict"
+        else:
+            add_bucket_delta(bucket_deltas, state["date"], state["category_id"], -float(state["amount"]), -1)
+            if item.op == "update":
+                state.update(item.expense.model_dump(exclude_unset=True, include=set(PUSH_FIELDS)))
+                add_bucket_delta(bucket_deltas, state["date"], state["category_id"], float(state["amount"]), 1)
+                if state["id"] is not None:
+                    updated[state["id"]] = state
+            else:
+                state["deleted"] = True
+            outcome["status"] = "applied"
+        results.append((outcome, state))
+
+    written = [s for s in created if not s.get("deleted")]
+    if written:
+        new_ids = (await db.scalars(
+            insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+            [
+                {"user_id": uid, "client_id": s["client_id"], **{f: s[f] for f in PUSH_FIELDS},
+                 "created_at": now, "updated_at": now, "change_seq": seq}
+                for s in written
+            ],
+        )).all()
+        for state, new_id in zip(written, new_ids):
+            state["id"] = new_id
+
+    changed = [s for s in updated.values() if not s.get("deleted")]
+    if changed:
+        # ORM bulk UPDATE by primary key: one executemany
+        await db.execute(update(Expense), [
+            {"id": s["id"], **{f: s[f] for f in PUSH_FIELDS}, "updated_at": now, "change_seq": seq}
+            for s in changed
+        ])
+
+    deleted_ids = [s["id"] for s in by_id.values() if s.get("deleted")]
+    if deleted_ids:
+        await db.execute(
+            delete(Expense)
+            .where(Expense.user_id == uid, Expense.id.in_(deleted_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await changes.add_tombstones(db, uid, changes.EXPENSE, deleted_ids, seq)
+
+    for state in written + changed:
+        state.update(updated_at=now, change_seq=seq)
+
+    bucket_deltas = net_bucket_deltas(bucket_deltas)
+    await db.run_sync(apply_rollup_deltas, uid, bucket_deltas)
+    await db.commit()
+
+    response = []
+    for outcome, state in results:
+        if state is not None:
+            outcome["id"] = state["id"]
+            if state.get("deleted"):
+                outcome["version"] = seq if state["id"] is not None else None
+            else:
+                outcome["version"] = state["change_seq"]
+                if outcome["status"] == "conflict":
+                    outcome["expense"] = state
+        response.append(outcome)
+
+    if written or changed or deleted_ids:
+        await invalidations.schedule(uid, [
+            StatsDelta(day, category_id, amount, count)
+            for (day, category_id), (amount, count) in bucket_deltas.items()
+        ])
+
+    return {"results": response}
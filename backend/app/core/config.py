@@ -11,7 +11,49 @@ class Settings(BaseSettings):
     DIRECT_URL: str | None = os.environ.get("DIRECT_URL")
     API_KEY: str | None = os.environ.get("API_KEY")
     REDIS_URL: str | None = os.environ.get("REDIS_URL")
-    
+
+    # Redis is a cache: fail fast rather than stall requests on it
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.25
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.25
+    REDIS_MAX_CONNECTIONS: int = 50
+    # Consecutive failures before Redis is bypassed, and for how long
+    REDIS_BREAKER_FAILURES: int = 5
+    REDIS_BREAKER_COOLDOWN_SECONDS: float = 10.0
+
+    # In-process (L1) cache in front of Redis
+    L1_CACHE_MAX_ITEMS: int = 10000
+    L1_CACHE_TTL_SECONDS: int = 30
+
+    # Cache stampede protection: how long one worker may hold a recompute lock,
+    # and how often the others poll for its result
+    SINGLE_FLIGHT_LOCK_MS: int = 5000
+    SINGLE_FLIGHT_POLL_MS: int = 50
+
+    # Stats older than this are still served, but refreshed in the background
+    STATS_CACHE_SOFT_TTL_SECONDS: int = 3600
+
+    # Cache updates after writes are deferred this long, so a burst of one
+    # user's writes costs a single update
+    CACHE_INVALIDATION_DELAY_MS: int = 50
+
+    # Idempotency-Key: how long a completed response is replayed to retries,
+    # and how long a request may run before its key can be claimed again
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_PENDING_TTL_SECONDS: int = 60
+
+    # asyncpg prepared statement cache per connection. Unset: 0 behind
+    # pgbouncer's transaction pooler (port 6543 or ?pgbouncer=true), where
+    # statements don't survive across transactions; asyncpg's default otherwise
+    DB_STATEMENT_CACHE_SIZE: int | None = None
+
+    # Bearer token required to scrape /metrics (disabled if unset)
+    METRICS_TOKEN: str | None = os.environ.get("METRICS_TOKEN")
+
+    # Development aid: count SQL statements per request (X-DB-Queries header)
+    # and log any statement repeated this many times as a suspected N+1
+    DB_QUERY_DEBUG: bool = os.environ.get("DB_QUERY_DEBUG", "False") == "True"
+    N_PLUS_ONE_THRESHOLD: int = 5
+
     JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY", "changeme") # Fallback for dev, but should be env
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 # 1 day
@@ -1,6 +1,11 @@
+from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import get_settings
+from app.core.metrics import instrument_engine
+from app.core.query_counter import track_queries
 
 settings = get_settings()
 
@@ -18,9 +23,115 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+instrument_engine(engine, "sync")
+track_queries(engine)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# URL parameters asyncpg (or SQLAlchemy's asyncpg dialect) accepts as-is;
+# libpq's sslmode is asyncpg's ssl
+_ASYNCPG_PARAMS = {
+    "ssl",
+    "target_session_attrs",
+    "prepared_statement_cache_size",
+}
+# pgbouncer's transaction pooler (Supabase serves it on 6543)
+_POOLER_PORT = 6543
+
+
+def _statement_cache_size(url) -> int | None:
+    """
+    asyncpg statement cache size for a postgresql URL: DB_STATEMENT_CACHE_SIZE,
+    else 0 behind pgbouncer in transaction mode, where server-side prepared
+    statements can't be reused. None keeps asyncpg's default.
+    """
+    if settings.DB_STATEMENT_CACHE_SIZE is not None:
+        return settings.DB_STATEMENT_CACHE_SIZE
+    if url.port == _POOLER_PORT or url.query.get("pgbouncer") == "true":
+        return 0
+    return None
+
+
+def _async_database_url(url: str) -> str:
+    """
+    Map the sync DATABASE_URL onto its async driver:
+    postgresql -> asyncpg, sqlite -> aiosqlite.
+    asyncpg rejects unknown connect arguments, so libpq-only query
+    parameters are dropped here (see _async_connect_args for the ones
+    that carry over).
+    """
+    if url.startswith("postgres://"):
+        # Heroku-style scheme
+        url = "postgresql://" + url[len("postgres://"):]
+
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    if backend == "postgresql":
+        query = {}
+        for key, value in parsed.query.items():
+            key = "ssl" if key == "sslmode" else key
+            if key in _ASYNCPG_PARAMS:
+                query[key] = value
+        if _statement_cache_size(parsed) == 0:
+            # SQLAlchemy's own cache of asyncpg prepared statements
+            query["prepared_statement_cache_size"] = "0"
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+
+    return parsed.render_as_string(hide_password=False)
+
+
+def _async_connect_args(url: str) -> dict:
+    """
+    asyncpg connect arguments that can't be expressed in the URL.
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return {}
+
+    args = {}
+    if "connect_timeout" in parsed.query:
+        args["timeout"] = float(parsed.query["connect_timeout"])
+    if "application_name" in parsed.query:
+        args["server_settings"] = {"application_name": parsed.query["application_name"]}
+
+    cache_size = _statement_cache_size(parsed)
+    if cache_size is not None:
+        args["statement_cache_size"] = cache_size
+    if cache_size == 0:
+        # A pooled server connection may already hold another client's
+        # statement under asyncpg's sequential names
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
+
+
+# Async engine for `async def` routes, so DB round trips don't block the event loop
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    connect_args=_async_connect_args(settings.DATABASE_URL),
+)
+
+instrument_engine(async_engine.sync_engine, "async")
+track_queries(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    # Keep attributes loaded after commit: lazy loads can't run implicitly in async
+    expire_on_commit=False,
+)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,124 @@
+"""
+Prometheus metrics, kept in process memory.
+Each worker process exposes its own values on /metrics; the scraper
+aggregates across workers.
+"""
+import time
+from typing import Callable
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Seconds; covers sub-millisecond cache calls up to slow requests
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+registry = CollectorRegistry()
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+DB_QUERIES = Counter(
+    "db_queries",
+    "SQL statements executed.",
+    ("engine",),
+    registry=registry,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time.",
+    ("engine",),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Connections handed out by the pool.",
+    ("engine",),
+    registry=registry,
+)
+DB_POOL_CONNECTS = Counter(
+    "db_pool_connects",
+    "New database connections opened by the pool.",
+    ("engine",),
+    registry=registry,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ("engine",),
+    registry=registry,
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round trip time by RedisClient operation.",
+    ("op", "outcome"),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by key family and result (hit, stale, miss, not_modified, bypass).",
+    ("family", "result"),
+    registry=registry,
+)
+REDIS_BREAKER_OPEN = Gauge(
+    "redis_breaker_open",
+    "1 while the Redis circuit breaker bypasses Redis, else 0.",
+    registry=registry,
+)
+
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Count and time every statement run on `engine`, and track its pool.
+    For an AsyncEngine pass its `sync_engine`.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start_time"].pop()
+        DB_QUERIES.labels(engine=name).inc()
+        DB_QUERY_DURATION.labels(engine=name).observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start_time")
+            if starts:
+                starts.pop()
+
+    # Pool events set on the engine also apply to the pools dispose() creates
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine=name)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.labels(engine=name).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(engine=name).inc()
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+
+def observe_cache(family: str, result: str):
+    CACHE_REQUESTS.labels(family=family, result=result).inc()
+
+
+def track_breaker(state: Callable[[], str]):
+    REDIS_BREAKER_OPEN.set_function(lambda: 1 if state() in ("open", "half_open") else 0)
@@ -0,0 +1,98 @@
+"""
+Per-request SQL statement counting, for spotting N+1 query patterns during
+development and holding endpoints to a query budget in tests:
+
+    with assert_max_queries(3):
+        client.get("/api/budgets", headers=auth)
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLog:
+    """
+    Statements executed while the log was active, keyed by SQL text.
+    A loop issuing the same query with different parameters shows up as one
+    statement with a high count.
+    """
+
+    def __init__(self, parent: Optional["QueryLog"] = None):
+        self.parent = parent
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def count(self) -> int:
+        return sum(self.statements.values())
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Statements run at least `threshold` times: suspected N+1 queries.
+        """
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+def track_queries(engine: Engine):
+    """
+    Record every statement run on `engine` into the active QueryLog, if any.
+    For an AsyncEngine pass its `sync_engine`.
+    """
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        log = _current_log.get()
+        if log is not None:
+            log.statements[statement] += 1
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryLog]:
+    """
+    Collect the statements executed inside the block, including those of
+    requests served through a TestClient. Nested blocks also report to the
+    enclosing one.
+    """
+    log = QueryLog(parent=_current_log.get())
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+        if log.parent is not None:
+            log.parent.statements.update(log.statements)
+
+
+@contextmanager
+def assert_max_queries(limit: int, repeat_threshold: Optional[int] = None) -> Iterator[QueryLog]:
+    """
+    Fail if the block runs more than `limit` statements, or (with
+    `repeat_threshold`) any single statement that many times.
+    """
+    with count_queries() as log:
+        yield log
+
+    if log.count > limit:
+        listing = "\n".join(f"  {n}x {sql}" for sql, n in log.statements.most_common())
+        raise AssertionError(f"Expected at most {limit} queries, ran {log.count}:\n{listing}")
+    if repeat_threshold is not None:
+        suspects = log.repeated(repeat_threshold)
+        if suspects:
+            listing = "\n".join(f"  {n}x {sql}" for sql, n in suspects)
+            raise AssertionError(f"Suspected N+1 queries:\n{listing}")
+
+
+def report_repeated(log: QueryLog, threshold: int, where: str):
+    """
+    Log statements run at least `threshold` times.
+    """
+    for sql, n in log.repeated(threshold):
+        logger.warning(f"Suspected N+1 in {where}: {n}x {' '.join(sql.split())[:200]}")
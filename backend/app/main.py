@@ -1,8 +1,16 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import hmac
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.core.config import get_settings
-from app.core.database import Base, engine
+from app.core.database import Base, engine, async_engine
+from app.core.metrics import HTTP_REQUEST_DURATION, registry, track_breaker
+from app.core.query_counter import count_queries, report_repeated
 from app.api import auth as auth_router
 from app.api import expenses as expenses_router
 from app.api.deps import get_current_user
@@ -10,13 +18,32 @@ from app.api import stats as stats_router
 from app.api import categories as categories_router
 from app.api import budgets as budgets_router
 from app.api import data as data_router
+from app.api import sync as sync_router
+from app.utils.invalidation import invalidations
+from app.utils.redis_client import redis_client
 
 settings = get_settings()
 
+track_breaker(lambda: redis_client.state)
+
 # Create tables for now (later: Alembic)
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep this worker's local cache coherent with the other workers
+    listener = asyncio.create_task(redis_client.listen_for_invalidations())
+    # Applies cache updates queued by writes (app.utils.invalidation)
+    invalidations.start()
+    yield
+    listener.cancel()
+    # The worker still applies what it has queued; wait for that
+    await invalidations.stop()
+    await async_engine.dispose()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # CORS: allow local web dev for now
 origins = ["*"]
@@ -26,17 +53,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Cache"],
+    expose_headers=[
+        "X-Cache", "ETag", "X-DB-Queries", "X-Next-Cursor", "X-Total-Count", "X-Total-Amount",
+        "Idempotent-Replayed",
+    ],
 )
 
+
+def _route_template(scope: dict) -> str:
+    """
+    Matched route template (/api/expenses/{expense_id}) rather than the raw
+    path, so label cardinality stays bounded.
+    """
+    # Routers included with a prefix keep their own relative paths;
+    # FastAPI records the full path of the matched route separately
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return route.path if route else "unmatched"
+
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_DURATION.labels(
+            method=request.method,
+            route=_route_template(request.scope),
+            status=status_code,
+        ).observe(time.perf_counter() - start)
+
+
+if settings.DB_QUERY_DEBUG:
+    @app.middleware("http")
+    async def count_request_queries(request: Request, call_next):
+        with count_queries() as log:
+            response = await call_next(request)
+        response.headers["X-DB-Queries"] = str(log.count)
+        report_repeated(log, settings.N_PLUS_ONE_THRESHOLD, f"{request.method} {request.url.path}")
+        return response
+
+
 app.include_router(auth_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(expenses_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(stats_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(categories_router.router, prefix=f"{settings.API_V1_PREFIX}/categories", tags=["categories"])
 app.include_router(budgets_router.router, prefix=settings.API_V1_PREFIX)
 app.include_router(data_router.router, prefix=settings.API_V1_PREFIX)
+app.include_router(sync_router.router, prefix=settings.API_V1_PREFIX)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """
+    Prometheus text exposition of this worker's metrics, for scrapers
+    holding METRICS_TOKEN. Disabled without a token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/")
 def root():
-    return {"status": "ok", "project": settings.PROJECT_NAME}
+    return {"status": "ok", "project": settings.PROJECT_NAME, "redis": redis_client.state}
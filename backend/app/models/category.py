@@ -1,11 +1,14 @@
 from datetime import datetime
-from sqlalchemy import Integer, String, DateTime, ForeignKey
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_change_seq", "user_id", "change_seq"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -13,6 +16,11 @@ class Category(Base):
     color: Mapped[str | None] = mapped_column(String(7), nullable=True)  # "#RRGGBB"
     icon: Mapped[str | None] = mapped_column(String(10), nullable=True, default="💰")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+    # Owner's change sequence at the last write, for delta sync
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(back_populates="categories")
     expenses: Mapped[list["Expense"]] = relationship(back_populates="category")
@@ -1,11 +1,24 @@
 from datetime import datetime, date
-from sqlalchemy import Integer, String, DateTime, Date, Numeric, ForeignKey
+from sqlalchemy import DDL, Integer, String, DateTime, Date, Numeric, ForeignKey, Index, event, func, text
+from sqlalchemy.dialects import postgresql  # registers the full text search functions
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Month/range lookups are always scoped to a user
+        Index("ix_expenses_user_date", "user_id", "date"),
+        Index("ix_expenses_user_category_date", "user_id", "category_id", "date"),
+        # Matches the expense listing order, for keyset pagination
+        Index(
+            "ix_expenses_user_date_created_id",
+            "user_id", text("date DESC"), text("created_at DESC"), text("id DESC"),
+        ),
+        Index("ix_expenses_user_change_seq", "user_id", "change_seq"),
+        Index("uq_expenses_user_client_id", "user_id", "client_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -13,7 +26,56 @@ class Expense(Base):
     date: Mapped[date] = mapped_column(Date, nullable=False)
     amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     description: Mapped[str | None] = mapped_column(String(500))
+    # Id given by the device that created the row offline (POST /sync/push)
+    client_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+    # Owner's change sequence at the last write, for delta sync
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(back_populates="expenses")
     category: Mapped["Category | None"] = relationship(back_populates="expenses")
+
+
+# Full-text search on descriptions (queried through app/utils/search.py).
+# Both indexes are maintained by the database itself, so every write path
+# (ORM, bulk statements, imports) keeps them current.
+FTS_CONFIG = "simple"  # language-neutral: descriptions are short, any language
+
+
+def description_tsvector():
+    """
+    Expression the Postgres GIN index is built on; queries must use exactly
+    this expression for the index to apply.
+    """
+    return func.to_tsvector(
+        text(f"'{FTS_CONFIG}'"), func.coalesce(Expense.description, text("''"))
+    )
+
+
+Index(
+    "ix_expenses_description_fts", description_tsvector(), postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+
+# SQLite: external-content FTS5 table over expenses.description, synced by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts "
+    "USING fts5(description, content='expenses', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO expenses_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_au AFTER UPDATE OF description ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO expenses_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+]
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Expense.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,31 @@
+from datetime import date
+from sqlalchemy import Integer, Date, Numeric, ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+# Category of a bucket as indexed: uncategorized maps to 0, which no category uses
+BUCKET_CATEGORY = text("coalesce(category_id, 0)")
+
+
+class ExpenseDailyRollup(Base):
+    """
+    Pre-aggregated spend per (user, day, category).
+    Kept in sync with `expenses` on every write so stats never scan raw history.
+    """
+    __tablename__ = "expense_daily_rollups"
+    __table_args__ = (
+        Index("ix_expense_daily_rollups_user_day", "user_id", "day"),
+        # One row per bucket; NULL (uncategorized) must collide with itself too
+        Index(
+            "uq_expense_daily_rollups_bucket",
+            "user_id", "day", BUCKET_CATEGORY,
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    category_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("categories.id"))
+    total: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
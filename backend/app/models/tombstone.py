@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class Tombstone(Base):
+    """
+    Marker left behind by a hard delete, so sync clients learn the row is gone.
+    """
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_user_change_seq", "user_id", "change_seq"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)  # "expense" | "category" | "budget"
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
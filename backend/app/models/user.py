@@ -17,6 +17,8 @@ class User(Base):
     )
     reset_token_hash: Mapped[str | None] = mapped_column(String(255), nullable=True)
     reset_token_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Last number handed out by app.utils.changes.next_change_seq
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     categories: Mapped[list["Category"]] = relationship(back_populates="user")
     expenses: Mapped[list["Expense"]] = relationship(back_populates="user")
@@ -26,3 +28,5 @@ from app.models.category import Category  # noqa: E402
 from app.models.expense import Expense   # noqa: E402
 from app.models.budget import Budget     # noqa: E402
 from app.models.token import RefreshToken # noqa: E402
+from app.models.rollup import ExpenseDailyRollup # noqa: E402
+from app.models.tombstone import Tombstone # noqa: E402
@@ -1,6 +1,6 @@
 import datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from app.schemas.category import Category
 
 class ExpenseBase(BaseModel):
@@ -25,3 +25,21 @@ class ExpenseRead(ExpenseBase):
 
     class Config:
         from_attributes = True
+
+class ExpenseBulkUpdate(ExpenseUpdate):
+    id: int
+
+class ExpenseBulkRequest(BaseModel):
+    create: List[ExpenseCreate] = []
+    update: List[ExpenseBulkUpdate] = []
+    delete: List[int] = []
+
+class ExpenseBulkResult(BaseModel):
+    op: Literal["create", "update", "delete"]
+    index: int  # position within its list in the request
+    id: Optional[int] = None
+    status: Literal["ok", "not_found"]
+    expense: Optional[ExpenseRead] = None
+
+class ExpenseBulkResponse(BaseModel):
+    results: List[ExpenseBulkResult]
@@ -46,3 +46,10 @@ class CategoryStats(BaseModel):
     year: int
     month: int | None = None
     categories: list[CategoryPoint]
+
+
+class DashboardStats(BaseModel):
+    summary: SummaryStats
+    daily: DailyStats
+    categories: CategoryStats
+    monthly: MonthlyStats
@@ -0,0 +1,66 @@
+import datetime
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from app.schemas.expense import ExpenseUpdate
+
+class ExpenseChange(BaseModel):
+    id: int
+    client_id: Optional[str] = None
+    amount: float
+    description: Optional[str] = None
+    date: datetime.date
+    category_id: Optional[int] = None
+    created_at: Optional[datetime.datetime] = None
+    updated_at: Optional[datetime.datetime] = None
+
+class CategoryChange(BaseModel):
+    id: int
+    name: str
+    color: Optional[str] = None
+    icon: Optional[str] = None
+    updated_at: Optional[datetime.datetime] = None
+
+class BudgetChange(BaseModel):
+    id: int
+    amount: float
+    month: datetime.date
+    category_id: Optional[int] = None
+    updated_at: Optional[datetime.datetime] = None
+
+class DeletedIds(BaseModel):
+    expenses: List[int] = []
+    categories: List[int] = []
+    budgets: List[int] = []
+
+class SyncChanges(BaseModel):
+    token: str  # pass back as ?since= on the next call
+    full: bool  # True: a complete snapshot, replace local state
+    expenses: List[ExpenseChange] = []
+    categories: List[CategoryChange] = []
+    budgets: List[BudgetChange] = []
+    deleted: DeletedIds = DeletedIds()
+
+class SyncOp(BaseModel):
+    op: Literal["create", "update", "delete"]
+    client_id: Optional[str] = Field(None, min_length=1, max_length=64)  # required for creates
+    id: Optional[int] = None  # server id, for rows without a client_id
+    base_version: Optional[int] = None  # row version the edit was made on; None skips the check
+    on_conflict: Literal["lww", "reject"] = "lww"
+    modified_at: Optional[datetime.datetime] = None  # when the edit was made, for "lww"
+    expense: Optional[ExpenseUpdate] = None  # fields to write; all of ExpenseCreate for a create
+
+class SyncPushRequest(BaseModel):
+    ops: List[SyncOp]
+
+class SyncOpResult(BaseModel):
+    index: int  # position in the op log
+    op: Literal["create", "update", "delete"]
+    client_id: Optional[str] = None
+    id: Optional[int] = None
+    status: Literal["applied", "conflict", "not_found", "rejected"]
+    detail: Optional[str] = None  # why the op was rejected
+    version: Optional[int] = None  # the row's version after the push
+    expense: Optional[ExpenseChange] = None  # server copy, for conflicts
+
+class SyncPushResponse(BaseModel):
+    results: List[SyncOpResult]
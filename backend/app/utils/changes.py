@@ -0,0 +1,46 @@
+"""
+Per-user change sequence behind GET /sync/changes.
+
+Every write transaction takes the next number from users.change_seq and
+stamps it on the rows it writes (their change_seq column) or, for deletes,
+on tombstones. Taking the number locks the user's row until commit, so a
+user's numbers become visible strictly in order: once a client has seen
+number N it has seen every change up to N.
+"""
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tombstone import Tombstone
+from app.models.user import User
+
+EXPENSE = "expense"
+CATEGORY = "category"
+BUDGET = "budget"
+
+
+async def next_change_seq(db: AsyncSession, user_id: int) -> int:
+    """
+    Allocate the change number of the current transaction. Call it before
+    the transaction's other writes: every writer then takes the user's row
+    lock first, so a user's concurrent writes queue there instead of
+    deadlocking on rows they lock in different orders.
+    """
+    return await db.scalar(
+        update(User)
+        .where(User.id == user_id)
+        # Not a profile change: keep updated_at as is
+        .values(change_seq=User.change_seq + 1, updated_at=User.updated_at)
+        .returning(User.change_seq)
+    )
+
+
+async def add_tombstones(db: AsyncSession, user_id: int, entity: str, ids, seq: int):
+    """
+    Record deleted rows of one entity type under change number `seq`.
+    """
+    ids = list(ids)
+    if ids:
+        await db.execute(insert(Tombstone), [
+            {"user_id": user_id, "entity": entity, "entity_id": entity_id, "change_seq": seq}
+            for entity_id in ids
+        ])
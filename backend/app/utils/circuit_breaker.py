@@ -0,0 +1,60 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing dependency for a while instead of paying its
+    timeout on every request.
+    After `failure_threshold` consecutive failures the breaker opens and
+    calls are skipped for `cooldown` seconds; then a single probe call is let
+    through, which closes the breaker on success or reopens it on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through now.
+        """
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at >= self.cooldown:
+            # Let one probe through per cooldown; its outcome decides the
+            # next state (a probe that never reports just gets retried)
+            self._opened_at = now
+            if self.state == OPEN:
+                self._set_state(HALF_OPEN)
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit breaker {self.name}: {self.state} -> {state} (failures={self.failures})")
+        self.state = state
@@ -0,0 +1,25 @@
+import base64
+from datetime import date, datetime
+
+import orjson
+
+
+def encode_cursor(day: date, created_at: datetime, row_id: int) -> str:
+    """
+    Opaque keyset cursor pointing just past the given row of a
+    (date desc, created_at desc, id desc) listing.
+    """
+    raw = orjson.dumps([day.isoformat(), created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, datetime, int]:
+    """
+    Inverse of encode_cursor. Raises ValueError on a malformed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        day, created_at, row_id = orjson.loads(raw)
+        return date.fromisoformat(day), datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
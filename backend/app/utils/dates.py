@@ -0,0 +1,25 @@
+from datetime import date
+
+# Bounds for user-supplied years: the range helpers below need year + 1 too
+MIN_YEAR = 1
+MAX_YEAR = 9998
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    """
+    Half-open [start, end) bounds of a calendar month.
+    Filtering with `col >= start AND col < end` keeps the predicate index-friendly.
+    """
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year, month + 1, 1)
+    return start, end
+
+
+def year_range(year: int) -> tuple[date, date]:
+    """
+    Half-open [start, end) bounds of a calendar year.
+    """
+    return date(year, 1, 1), date(year + 1, 1, 1)
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Responses are per user and must be revalidated before reuse
+CACHE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def make_etag(version: Optional[int], user_id: int, *parts: Any) -> Optional[str]:
+    """
+    Weak ETag for a per-user response, built from the user's data version
+    (invalidations.versions) and the parameters that shape the response
+    (resolved defaults included). None if the version is unavailable.
+    Read the version before loading the data: a write between the two then
+    yields a tag that is already outdated, never a current tag on old data.
+    """
+    if version is None:
+        return None
+    scope = ":".join(str(p) for p in (user_id, *parts))
+    digest = hashlib.blake2b(scope.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """
+    Whether the request's If-None-Match already names `etag` (weak comparison).
+    """
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def etag_headers(etag: Optional[str]) -> dict[str, str]:
+    if etag is None:
+        return {}
+    return {"ETag": etag, **CACHE_HEADERS}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
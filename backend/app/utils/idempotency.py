@@ -0,0 +1,89 @@
+"""
+Idempotency-Key support, so a retried POST returns the first response
+instead of writing again.
+
+The first request with a key claims it in Redis with a pending marker
+(SET NX). Once its transaction commits, the marker is replaced by the
+response, which later requests with the same key get back as is.
+"""
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.utils.redis_client import redis_client
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKey:
+    """
+    A client's Idempotency-Key, scoped to one user and one endpoint.
+    """
+
+    def __init__(self, user_id: int, scope: str, key: str):
+        self.redis_key = f"idem:{user_id}:{scope}:{key}"
+        self.fingerprint: Optional[str] = None
+        self.claimed = False
+        self.saved = False
+
+    async def claim(self, body: bytes | str) -> Optional[JSONResponse]:
+        """
+        Claim the key for this request, whose payload is `body`.
+        Returns the stored response if an earlier request with the key
+        succeeded; None means this request should run. Without Redis the
+        request just runs, unprotected.
+        """
+        if isinstance(body, str):
+            body = body.encode()
+        self.fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+        marker = redis_client.dumps({"fingerprint": self.fingerprint})
+        stored = await redis_client.set_raw_if_absent(
+            self.redis_key, marker, settings.IDEMPOTENCY_PENDING_TTL_SECONDS
+        )
+        if stored is not False:
+            self.claimed = bool(stored)
+            return None
+
+        raw = await redis_client.get_stored(self.redis_key)
+        record = orjson.loads(raw) if raw else None
+        if record is not None and record["fingerprint"] != self.fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if record is None or "status" not in record:
+            # The first request is still running (or just gave up its claim)
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is in progress",
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(
+            record["body"], status_code=record["status"], headers={"Idempotent-Replayed": "true"}
+        )
+
+    async def save(self, status_code: int, body: Any):
+        """
+        Record the response (a JSON-ready body) for retries. Call it as soon
+        as the request's transaction has committed.
+        """
+        if not self.claimed:
+            return
+        record = {"fingerprint": self.fingerprint, "status": status_code, "body": body}
+        await redis_client.set_raw(
+            self.redis_key, redis_client.dumps(record), ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS
+        )
+        self.saved = True
+
+    async def release(self):
+        """
+        Give up a claim that produced no response, so the client can retry.
+        """
+        if self.claimed and not self.saved:
+            await redis_client.delete_cache(self.redis_key)
+            self.claimed = False
@@ -0,0 +1,172 @@
+"""
+Deferred cache maintenance after writes.
+
+Writes queue their cache work here instead of doing it before responding.
+A background task applies each user's queued work once per short interval,
+so a burst of writes (an offline sync, a client retrying) costs a single
+stats update and data version bump.
+
+Read-your-writes: queuing a write marks the user as pending in Redis, and
+while any mark is left get_user_versions reports no versions, so readers
+bypass cached views and ETags. A worker applies its own queued work before
+reading (versions), so only other workers' reads see the bypass.
+"""
+import asyncio
+import logging
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.utils.redis_client import redis_client
+from app.utils.rollups import add_bucket_delta, net_bucket_deltas
+from app.utils.stats_cache import StatsDelta, apply_stats_deltas
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    """
+    Cache work queued for one user.
+    """
+
+    def __init__(self):
+        # (day, category_id) -> (amount, count), as in apply_rollup_deltas
+        self.deltas: dict = {}
+        # Drop the whole generation instead of patching views
+        self.full = False
+        # Pending marks recorded in Redis for this job's writes
+        self.marks = 0
+
+
+class InvalidationQueue:
+    """
+    Per-user queue of cache updates, drained in the background by a worker
+    (see start). Without a running worker (scripts, a bare TestClient) work
+    is applied as soon as it is queued.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.running = False
+        self._jobs: dict[int, _Job] = {}
+        # user_id -> resolved once the user's update in progress is applied
+        self._applying: dict[int, asyncio.Future] = {}
+        # Created by start(), on the loop the worker runs on
+        self._wake: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def schedule(self, user_id: int, deltas: Iterable[StatsDelta] = (), full: bool = False):
+        """
+        Queue the cache work of a committed write: patch cached stats with
+        `deltas`, or drop all of the user's cached views if `full`, then bump
+        the data version.
+        """
+        if not self.running:
+            job = _Job()
+            job.full = full
+            for d in deltas:
+                add_bucket_delta(job.deltas, d.day, d.category_id, d.amount, d.count)
+            await self._apply(user_id, job)
+            return
+
+        # Mark first: once the job is visible it may be taken at any await
+        marked = await redis_client.mark_pending(user_id)
+        job = self._jobs.setdefault(user_id, _Job())
+        job.full = job.full or full
+        for d in deltas:
+            add_bucket_delta(job.deltas, d.day, d.category_id, d.amount, d.count)
+        if marked:
+            job.marks += 1
+        self._wake.set()
+
+    async def flush(self, user_id: Optional[int] = None):
+        """
+        Apply queued work now, for one user or everyone.
+        """
+        user_ids = list(self._jobs) if user_id is None else [user_id]
+        for uid in user_ids:
+            # One update per user at a time, so readers can wait for it
+            while (applying := self._applying.get(uid)) is not None:
+                await asyncio.shield(applying)
+            job = self._jobs.pop(uid, None)
+            if job is None:
+                continue
+            done = asyncio.get_running_loop().create_future()
+            self._applying[uid] = done
+            try:
+                await self._apply(uid, job)
+            finally:
+                del self._applying[uid]
+                done.set_result(None)
+
+    async def versions(self, user_id: int) -> tuple[Optional[int], Optional[int]]:
+        """
+        get_user_versions for readers, after applying this worker's queued
+        work for the user (or waiting for it to be applied).
+        """
+        if user_id in self._jobs or user_id in self._applying:
+            await self.flush(user_id)
+        return await redis_client.get_user_versions(user_id)
+
+    async def _apply(self, user_id: int, job: _Job):
+        try:
+            if job.full:
+                await redis_client.bump_generation(user_id)
+            else:
+                deltas = net_bucket_deltas(job.deltas)
+                await apply_stats_deltas(user_id, [
+                    StatsDelta(day, category_id, amount, count)
+                    for (day, category_id), (amount, count) in deltas.items()
+                ])
+            await redis_client.bump_data_version(user_id)
+        except Exception as e:
+            logger.error(f"Cache update failed for user {user_id}: {e}")
+            await redis_client.bump_generation(user_id)
+        finally:
+            # Only now may readers trust the cache again
+            await redis_client.clear_pending(user_id, job.marks)
+
+    def start(self):
+        """
+        Start the worker on the running event loop (once per app lifespan).
+        """
+        self._wake = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        self._worker.add_done_callback(self._worker_done)
+
+    async def stop(self):
+        """
+        Stop the worker, once it has applied the work still queued.
+        """
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        worker.cancel()
+        # Failures are logged by _worker_done
+        await asyncio.wait([worker])
+
+    @staticmethod
+    def _worker_done(worker: asyncio.Task):
+        if not worker.cancelled() and worker.exception() is not None:
+            e = worker.exception()
+            logger.error(f"Cache invalidation worker failed: {e!r}", exc_info=e)
+
+    async def _run(self):
+        """
+        Apply queued work a short delay after it arrives.
+        Work still queued when the task is cancelled is applied first.
+        """
+        self.running = True
+        try:
+            while True:
+                await self._wake.wait()
+                # Let the rest of a burst arrive
+                await asyncio.sleep(self.delay)
+                self._wake.clear()
+                await self.flush()
+        finally:
+            self.running = False
+            await self.flush()
+
+
+# Per-process instance
+invalidations = InvalidationQueue(settings.CACHE_INVALIDATION_DELAY_MS / 1000)
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Size-bounded LRU with a per-entry TTL, private to one worker process.
+    Sits in front of Redis so hot keys skip the network round trip.
+    Thread-safe: sync routes touch it from the threadpool.
+    """
+
+    def __init__(self, max_items: int, ttl: float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every delete/clear; see fill()
+        self.epoch = 0
+
+    def get(self, key: str) -> Any:
+        """
+        Return the cached value, or None if missing/expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def fill(self, key: str, value: Any, epoch: int, ttl: Optional[float] = None):
+        """
+        Cache a value read from Redis, unless anything was invalidated since
+        `epoch` (read before the Redis call): the read may predate the
+        invalidation and would put the old value back.
+        """
+        with self._lock:
+            if self.epoch == epoch:
+                self._store(key, value, ttl)
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            self.epoch += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Per-process instance
+local_cache = LocalCache(
+    max_items=settings.L1_CACHE_MAX_ITEMS,
+    ttl=settings.L1_CACHE_TTL_SECONDS,
+)
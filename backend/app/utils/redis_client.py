@@ -1,33 +1,84 @@
 
-import json
+import asyncio
 import os
 import logging
+import time
+import uuid
 from dotenv import load_dotenv
 
 # Load environment variables explicitly
 load_dotenv()
 
-from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, Any
+from typing import Optional, Any, Callable
 
+import orjson
 import redis.asyncio as redis
-from redis.exceptions import ConnectionError, RedisError
+from redis.exceptions import ConnectionError, RedisError, WatchError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from app.core.config import settings
+from app.core.metrics import REDIS_COMMAND_DURATION
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.local_cache import local_cache
 
 logger = logging.getLogger(__name__)
 
-class CustomEncoder(json.JSONEncoder):
+# Pub/sub channel telling every worker to drop keys from its local cache
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Delete a lock only if it is still held with our token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Replace a cached value only if nobody changed it since it was read
+SET_IF_UNCHANGED_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Store cached values only if none of the first ARGV[1] keys (user counters)
+# changed since they were read; absent keys are passed as ""
+SET_IF_GUARDS_UNCHANGED_SCRIPT = """
+local guards = tonumber(ARGV[1])
+for i = 1, guards do
+    if (redis.call("get", KEYS[i]) or "") ~= ARGV[i + 2] then
+        return 0
+    end
+end
+for i = guards + 1, #KEYS do
+    redis.call("set", KEYS[i], ARGV[i + 2], "EX", ARGV[2])
+end
+return 1
+"""
+
+# Take back writes marked as pending; the key goes once none are left
+CLEAR_PENDING_SCRIPT = """
+local left = redis.call("decrby", KEYS[1], ARGV[1])
+if left <= 0 then
+    redis.call("del", KEYS[1])
+end
+return left
+"""
+
+# A pending mark outlives a worker that died before clearing it only this long
+PENDING_TTL_SECONDS = 60
+
+def _json_default(obj):
     """
-    JSON Encoder to handle datetime, date, and Decimal objects.
+    orjson fallback for types it does not serialize natively.
+    (datetime and date are native and come out in ISO format.)
     """
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super().default(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 class RedisClient:
     _instance = None
@@ -36,6 +87,13 @@ class RedisClient:
         # Try from settings first, then fallback to os.getenv in case settings loaded too early
         self.redis_url = settings.REDIS_URL or os.getenv("REDIS_URL")
         self.client: Optional[redis.Redis] = None
+        self.breaker = CircuitBreaker(
+            "redis",
+            failure_threshold=settings.REDIS_BREAKER_FAILURES,
+            cooldown=settings.REDIS_BREAKER_COOLDOWN_SECONDS,
+        )
+        # Counter bumps that could not reach Redis, replayed once it is back
+        self._pending_bumps: set[str] = set()
         
         # Log the URL (masking password)
         if self.redis_url:
@@ -52,7 +110,17 @@ class RedisClient:
             
         if self.redis_url:
             try:
-                self.client = redis.from_url(self.redis_url, decode_responses=True)
+                # Values stay bytes: cached JSON is served to clients as-is.
+                # A blocking pool caps connections; waiting for a free one is
+                # bounded like any other Redis call.
+                pool = redis.BlockingConnectionPool.from_url(
+                    self.redis_url,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                )
+                self.client = redis.Redis(connection_pool=pool)
                 logger.info("Redis client initialized.")
             except Exception as e:
                 logger.error(f"Failed to initialize Redis client: {e}")
@@ -65,68 +133,736 @@ class RedisClient:
             cls._instance = cls()
         return cls._instance
 
+    @property
+    def state(self) -> str:
+        """
+        "disabled" without REDIS_URL, otherwise the circuit breaker state.
+        """
+        return self.breaker.state if self.client else "disabled"
+
+    def _available(self) -> bool:
+        """
+        Whether to call Redis at all: configured, and the breaker not open.
+        """
+        return self.client is not None and self.breaker.allow()
+
+    def _record_success(self, op: str, start: float):
+        REDIS_COMMAND_DURATION.labels(op=op, outcome="ok").observe(time.perf_counter() - start)
+        self.breaker.record_success()
+
+    def _record_failure(self, e: Exception, op: str, start: float):
+        REDIS_COMMAND_DURATION.labels(op=op, outcome="error").observe(time.perf_counter() - start)
+        # Only transport problems say Redis is unhealthy
+        if isinstance(e, (ConnectionError, RedisTimeoutError, OSError)):
+            self.breaker.record_failure()
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_json_default)
+
+    @staticmethod
+    def encode_entry(payload: bytes, soft_expires_at: Optional[float] = None) -> bytes:
+        """
+        Build the stored form of a JSON payload. Payloads with a soft expiry
+        carry its unix timestamp on a first line: b"1735689600.000\n{...}".
+        """
+        if soft_expires_at is None:
+            return payload
+        return b"%.3f\n%b" % (soft_expires_at, payload)
+
+    @staticmethod
+    def decode_entry(raw: bytes) -> tuple[bytes, Optional[float]]:
+        """
+        Inverse of encode_entry: (payload, soft_expires_at or None).
+        """
+        # Compact JSON never contains a raw newline, so one can only mean a header
+        head, sep, payload = raw.partition(b"\n")
+        if not sep:
+            return raw, None
+        return payload, float(head)
+
+    async def get_raw(self, key: str) -> Optional[tuple[bytes, bool]]:
+        """
+        Retrieve (JSON payload, is_stale) from the local cache, then Redis.
+        A payload is stale once past the soft expiry given to set_raw.
+        Returns None if key doesn't exist or Redis is down.
+        """
+        if not self._available():
+            return None
+
+        entry = local_cache.get(key)
+        if entry is None:
+            epoch = local_cache.epoch
+            start = time.perf_counter()
+            try:
+                raw = await self.client.get(key)
+                self._record_success("get", start)
+                if not raw:
+                    return None
+                entry = self.decode_entry(raw)
+            except (ConnectionError, RedisError, Exception) as e:
+                self._record_failure(e, "get", start)
+                logger.error(f"Redis get_raw error for key {key}: {e}")
+                return None
+            local_cache.fill(key, entry, epoch)
+
+        payload, soft_expires_at = entry
+        return payload, soft_expires_at is not None and soft_expires_at <= time.time()
+
+    async def get_many_raw(self, keys: list[str]) -> dict[str, tuple[bytes, bool]]:
+        """
+        Batch get_raw: {key: (JSON payload, is_stale)} for the keys that exist.
+        Keys missing from the local cache are fetched with a single MGET.
+        """
+        if not keys or not self._available():
+            return {}
+
+        entries: dict[str, tuple[bytes, Optional[float]]] = {}
+        remote = []
+        for key in keys:
+            entry = local_cache.get(key)
+            if entry is None:
+                remote.append(key)
+            else:
+                entries[key] = entry
+
+        if remote:
+            epoch = local_cache.epoch
+            start = time.perf_counter()
+            try:
+                raw_values = await self.client.mget(remote)
+                self._record_success("mget", start)
+            except (ConnectionError, RedisError, Exception) as e:
+                self._record_failure(e, "mget", start)
+                logger.error(f"Redis get_many error for {len(remote)} keys: {e}")
+                raw_values = []
+            for key, raw in zip(remote, raw_values):
+                if raw:
+                    entries[key] = self.decode_entry(raw)
+                    local_cache.fill(key, entries[key], epoch)
+
+        now = time.time()
+        return {
+            key: (payload, soft_expires_at is not None and soft_expires_at <= now)
+            for key, (payload, soft_expires_at) in entries.items()
+        }
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """
+        Batch get_cache: {key: value} for the keys that exist, stale or not.
+        """
+        entries = await self.get_many_raw(keys)
+        return {key: orjson.loads(payload) for key, (payload, _) in entries.items()}
+
     async def get_cache(self, key: str) -> Optional[Any]:
         """
-        Retrieve a value from Redis.
+        Retrieve a value from the local cache, then Redis, stale or not.
         Returns None if key doesn't exist or Redis is down.
         """
-        if not self.client:
+        entry = await self.get_raw(key)
+        return orjson.loads(entry[0]) if entry else None
+
+    async def get_stored(self, key: str) -> Optional[bytes]:
+        """
+        Read the stored bytes straight from Redis, bypassing the local cache.
+        """
+        if not self._available():
             return None
-        
+
+        start = time.perf_counter()
         try:
-            val = await self.client.get(key)
-            if val:
-                return json.loads(val)
+            raw = await self.client.get(key)
+            self._record_success("get", start)
+            return raw
         except (ConnectionError, RedisError, Exception) as e:
-            logger.error(f"Redis get_cache error for key {key}: {e}")
+            self._record_failure(e, "get", start)
+            logger.error(f"Redis get_stored error for key {key}: {e}")
             return None
-        
-        return None
 
-    async def set_cache(self, key: str, value: Any, ttl: int = 3600):
+    async def get_stored_many(self, keys: list[str]) -> Optional[dict[str, bytes]]:
         """
-        Set a value in Redis with a TTL.
+        Batch get_stored in one MGET: {key: stored bytes, b"" if absent}.
+        Returns None if Redis is down.
+        """
+        if not self._available():
+            return None
+
+        start = time.perf_counter()
+        try:
+            raw_values = await self.client.mget(keys)
+            self._record_success("mget", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "mget", start)
+            logger.error(f"Redis get_stored_many error for {len(keys)} keys: {e}")
+            return None
+        return {key: raw or b"" for key, raw in zip(keys, raw_values)}
+
+    async def set_raw(
+        self,
+        key: str,
+        payload: bytes,
+        ttl: int = 3600,
+        soft_ttl: Optional[int] = None,
+    ):
+        """
+        Store an already serialized JSON payload with a TTL, and optionally a
+        soft TTL after which readers see it as stale (see get_raw).
         Fails silently if Redis is down.
         """
-        if not self.client:
+        if not self._available():
             return
 
+        epoch = local_cache.epoch
+        start = time.perf_counter()
         try:
-            json_str = json.dumps(value, cls=CustomEncoder)
-            await self.client.setex(key, ttl, json_str)
+            soft_expires_at = time.time() + soft_ttl if soft_ttl else None
+            await self.client.setex(key, ttl, self.encode_entry(payload, soft_expires_at))
+            self._record_success("set", start)
+            local_cache.fill(key, (payload, soft_expires_at), epoch, ttl)
         except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "set", start)
+            logger.error(f"Redis set_raw error for key {key}: {e}")
+
+    async def set_many_raw(
+        self,
+        payloads: dict[str, bytes],
+        ttl: int | dict[str, int] = 3600,
+        soft_ttl: Optional[int] = None,
+    ):
+        """
+        Batch set_raw in one pipelined round trip. `ttl` is either shared or
+        given per key.
+        Fails silently if Redis is down.
+        """
+        if not payloads or not self._available():
+            return
+
+        soft_expires_at = time.time() + soft_ttl if soft_ttl else None
+        ttls = ttl if isinstance(ttl, dict) else dict.fromkeys(payloads, ttl)
+        epoch = local_cache.epoch
+        start = time.perf_counter()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, payload in payloads.items():
+                    pipe.setex(key, ttls[key], self.encode_entry(payload, soft_expires_at))
+                await pipe.execute()
+            self._record_success("set_many", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "set_many", start)
+            logger.error(f"Redis set_many error for {len(payloads)} keys: {e}")
+            return
+
+        for key, payload in payloads.items():
+            local_cache.fill(key, (payload, soft_expires_at), epoch, ttls[key])
+
+    async def set_many(
+        self,
+        values: dict[str, Any],
+        ttl: int | dict[str, int] = 3600,
+        soft_ttl: Optional[int] = None,
+    ):
+        """
+        Batch set_cache in one pipelined round trip (shared or per-key TTLs).
+        """
+        try:
+            payloads = {key: self.dumps(value) for key, value in values.items()}
+        except TypeError as e:
+            logger.error(f"Redis set_many error: {e}")
+            return
+        await self.set_many_raw(payloads, ttl=ttl, soft_ttl=soft_ttl)
+
+    async def set_cache(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 3600,
+        soft_ttl: Optional[int] = None,
+    ):
+        """
+        Set a value in Redis with a TTL (and optional soft TTL).
+        Fails silently if Redis is down.
+        """
+        if not self._available():
+            return
+
+        try:
+            payload = self.dumps(value)
+        except TypeError as e:
             logger.error(f"Redis set_cache error for key {key}: {e}")
+            return
+        await self.set_raw(key, payload, ttl=ttl, soft_ttl=soft_ttl)
 
-    async def delete_cache(self, key: str):
+    async def set_raw_if_unchanged(
+        self,
+        key: str,
+        expected: bytes,
+        payload: bytes,
+        ttl: int = 3600,
+        soft_ttl: Optional[int] = None,
+    ) -> bool:
         """
-        Delete a key from Redis.
+        Like set_raw, but only if the key still holds `expected`
+        (as read by get_stored). Returns whether the payload was stored.
+        """
+        if not self._available():
+            return False
+
+        start = time.perf_counter()
+        try:
+            soft_expires_at = time.time() + soft_ttl if soft_ttl else None
+            replaced = await self.client.eval(
+                SET_IF_UNCHANGED_SCRIPT,
+                1,
+                key,
+                expected,
+                self.encode_entry(payload, soft_expires_at),
+                ttl,
+            )
+            self._record_success("set_if_unchanged", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "set_if_unchanged", start)
+            logger.error(f"Redis set_raw_if_unchanged error for key {key}: {e}")
+            return False
+
+        if replaced:
+            # Not refilled here: this worker reads it back like the others
+            await self.invalidate_local(key)
+        return bool(replaced)
+
+    async def set_many_raw_if_guards_unchanged(
+        self,
+        payloads: dict[str, bytes],
+        guards: dict[str, bytes],
+        ttl: int = 3600,
+        soft_ttl: Optional[int] = None,
+    ) -> bool:
+        """
+        Like set_many_raw, but only if every guard key still holds the bytes
+        read by get_stored_many, checked and written atomically.
+        Returns whether the payloads were stored.
+        """
+        if not payloads or not self._available():
+            return False
+
+        soft_expires_at = time.time() + soft_ttl if soft_ttl else None
+        epoch = local_cache.epoch
+        start = time.perf_counter()
+        try:
+            stored = await self.client.eval(
+                SET_IF_GUARDS_UNCHANGED_SCRIPT,
+                len(guards) + len(payloads),
+                *guards,
+                *payloads,
+                len(guards),
+                ttl,
+                *guards.values(),
+                *(self.encode_entry(p, soft_expires_at) for p in payloads.values()),
+            )
+            self._record_success("set_if_guards_unchanged", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "set_if_guards_unchanged", start)
+            logger.error(f"Redis set_many_raw_if_guards_unchanged error for {len(payloads)} keys: {e}")
+            return False
+
+        if stored:
+            for key, payload in payloads.items():
+                local_cache.fill(key, (payload, soft_expires_at), epoch, ttl)
+        return bool(stored)
+
+    async def set_raw_if_absent(self, key: str, payload: bytes, ttl: int) -> Optional[bool]:
+        """
+        Store a payload only if the key does not exist (SET NX), bypassing the
+        local cache. Returns whether it was stored, or None if Redis is down.
+        """
+        if not self._available():
+            return None
+
+        start = time.perf_counter()
+        try:
+            stored = await self.client.set(key, payload, nx=True, ex=ttl)
+            self._record_success("set_if_absent", start)
+            return bool(stored)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "set_if_absent", start)
+            logger.error(f"Redis set_raw_if_absent error for key {key}: {e}")
+            return None
+
+    async def delete_cache(self, *keys: str):
+        """
+        Delete one or more keys from Redis in a single DEL.
         Fails silently if Redis is down.
         """
+        if not keys or not self._available():
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.client.delete(*keys)
+            self._record_success("delete", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "delete", start)
+            logger.error(f"Redis delete_cache error for keys {keys}: {e}")
+
+        await self.invalidate_local(*keys)
+
+    async def update_many(
+        self,
+        keys: list[str],
+        transform: Callable[[dict[str, Any]], dict[str, Any]],
+    ) -> bool:
+        """
+        Atomically read-modify-write several cached values (WATCH/MULTI).
+        `transform` receives {key: value} for the keys that currently exist and
+        returns {key: new_value}; a None value deletes the key. TTLs and soft
+        expiries are kept.
+        Returns False if another client touched the keys meanwhile or Redis
+        failed, so the caller can fall back to invalidation.
+        """
+        if not self.client:
+            return True
+        if not self._available():
+            return False
+
+        start = time.perf_counter()
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(*keys)
+                raw_values = await pipe.mget(keys)
+                entries = {
+                    key: self.decode_entry(raw)
+                    for key, raw in zip(keys, raw_values)
+                    if raw is not None
+                }
+                current = {key: orjson.loads(payload) for key, (payload, _) in entries.items()}
+                if not current:
+                    return True
+
+                updated = transform(current)
+
+                pipe.multi()
+                for key, value in updated.items():
+                    if value is None:
+                        pipe.delete(key)
+                    else:
+                        soft_expires_at = entries[key][1] if key in entries else None
+                        pipe.set(
+                            key,
+                            self.encode_entry(self.dumps(value), soft_expires_at),
+                            keepttl=True,
+                        )
+                await pipe.execute()
+
+            self._record_success("update_many", start)
+            await self.invalidate_local(*updated)
+            return True
+        except WatchError:
+            self._record_success("update_many", start)
+            logger.info(f"Redis update_many lost a race on {len(keys)} keys")
+            return False
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "update_many", start)
+            logger.error(f"Redis update_many error: {e}")
+            return False
+
+    @staticmethod
+    def generation_key(user_id: int) -> str:
+        return f"user:{user_id}:gen"
+
+    @staticmethod
+    def data_version_key(user_id: int) -> str:
+        return f"user:{user_id}:ver"
+
+    @staticmethod
+    def pending_key(user_id: int) -> str:
+        return f"user:{user_id}:pending"
+
+    @classmethod
+    def version_keys(cls, user_id: int) -> list[str]:
+        """
+        Counters every write of the user changes before its cache work is
+        done: guards for caching views computed from the database.
+        """
+        return [cls.generation_key(user_id), cls.data_version_key(user_id), cls.pending_key(user_id)]
+
+    @staticmethod
+    def user_key(user_id: int, generation: int, *parts: Any) -> str:
+        """
+        Build a versioned per-user key, e.g. user:42:g7:daily:2025:1.
+        Bumping the generation orphans every key of the previous one;
+        those simply age out through their TTL.
+        """
+        suffix = ":".join(str(p) for p in parts)
+        return f"user:{user_id}:g{generation}:{suffix}"
+
+    async def _get_counters(self, *keys: str) -> Optional[list[int]]:
+        """
+        Read counters (0 if never bumped) through the local cache, fetching
+        the rest with one MGET.
+        Returns None if Redis is down, so callers skip whatever depends on
+        them instead of trusting possibly outdated values.
+        """
+        if self._pending_bumps:
+            await self.flush_pending_bumps()
+        if not self._available():
+            return None
+
+        values = {key: local_cache.get(key) for key in keys}
+        remote = [key for key, value in values.items() if value is None]
+        if remote:
+            epoch = local_cache.epoch
+            start = time.perf_counter()
+            try:
+                raw_values = await self.client.mget(remote)
+                self._record_success("get_counters", start)
+            except (ConnectionError, RedisError, Exception) as e:
+                self._record_failure(e, "get_counters", start)
+                logger.error(f"Redis get error for counters {remote}: {e}")
+                return None
+            for key, val in zip(remote, raw_values):
+                values[key] = int(val) if val else 0
+                local_cache.fill(key, values[key], epoch)
+
+        return [values[key] for key in keys]
+
+    async def _get_counter(self, key: str) -> Optional[int]:
+        values = await self._get_counters(key)
+        return values[0] if values else None
+
+    async def _bump_counter(self, key: str) -> Optional[int]:
+        """
+        INCR a counter and drop it from every worker's local cache.
+        Counters have no TTL so they can never fall back to an old value.
+        If Redis cannot be reached the bump is queued (flush_pending_bumps).
+        """
         if not self.client:
+            return None
+        if not self._available():
+            self._pending_bumps.add(key)
+            return None
+
+        start = time.perf_counter()
+        try:
+            value = await self.client.incr(key)
+            self._record_success("incr", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "incr", start)
+            self._pending_bumps.add(key)
+            logger.error(f"Redis incr error for counter {key}: {e}")
+            return None
+
+        await self.invalidate_local(key)
+        return value
+
+    async def flush_pending_bumps(self):
+        """
+        Replay counter bumps missed while Redis was unreachable, so cached
+        views and ETags from before the outage are not trusted after it.
+        """
+        if not self._pending_bumps or not self._available():
             return
 
+        keys = list(self._pending_bumps)
+        start = time.perf_counter()
         try:
-            await self.client.delete(key)
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.incr(key)
+                await pipe.execute()
+            self._record_success("flush_bumps", start)
         except (ConnectionError, RedisError, Exception) as e:
-            logger.error(f"Redis delete_cache error for key {key}: {e}")
+            self._record_failure(e, "flush_bumps", start)
+            logger.error(f"Redis error replaying {len(keys)} counter bumps: {e}")
+            return
+
+        self._pending_bumps.difference_update(keys)
+        logger.info(f"Replayed {len(keys)} counter bumps after a Redis outage")
+        await self.invalidate_local(*keys)
+
+    async def get_generation(self, user_id: int) -> Optional[int]:
+        """
+        Current cache generation for a user (0 if never bumped), or None if
+        Redis is down.
+        """
+        return await self._get_counter(self.generation_key(user_id))
+
+    async def bump_generation(self, user_id: int) -> Optional[int]:
+        """
+        Invalidate every versioned key of a user with a single INCR.
+        """
+        return await self._bump_counter(self.generation_key(user_id))
+
+    async def get_user_versions(self, user_id: int) -> tuple[Optional[int], Optional[int]]:
+        """
+        (cache generation, data version) of a user in one round trip,
+        each None if Redis is down. Also (None, None) while some of the
+        user's writes are not reflected in the cache yet (mark_pending), so
+        readers bypass the cache rather than miss their own writes.
+        """
+        values = await self._get_counters(
+            self.generation_key(user_id), self.data_version_key(user_id), self.pending_key(user_id)
+        )
+        if not values or values[2] > 0:
+            return None, None
+        return values[0], values[1]
+
+    async def mark_pending(self, user_id: int) -> bool:
+        """
+        Record a committed write whose cache update is deferred (see
+        app.utils.invalidation). Returns whether it was recorded; each
+        recorded mark is taken back by clear_pending.
+        """
+        if not self._available():
+            return False
+
+        key = self.pending_key(user_id)
+        start = time.perf_counter()
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, PENDING_TTL_SECONDS)
+                await pipe.execute()
+            self._record_success("mark_pending", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "mark_pending", start)
+            logger.error(f"Redis mark_pending error for user {user_id}: {e}")
+            return False
+
+        await self.invalidate_local(key)
+        return True
+
+    async def clear_pending(self, user_id: int, count: int):
+        """
+        Take back `count` marks once their writes are reflected in the cache.
+        """
+        if not count or not self._available():
+            return
+
+        key = self.pending_key(user_id)
+        start = time.perf_counter()
+        try:
+            await self.client.eval(CLEAR_PENDING_SCRIPT, 1, key, count)
+            self._record_success("clear_pending", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "clear_pending", start)
+            logger.error(f"Redis clear_pending error for user {user_id}: {e}")
+            return
+
+        await self.invalidate_local(key)
+
+    async def bump_data_version(self, user_id: int) -> Optional[int]:
+        """
+        Mark a user's data as changed. Call after the write is committed and
+        cached views are updated, so a new version never tags old data.
+        """
+        return await self._bump_counter(self.data_version_key(user_id))
+
+    async def invalidate_local(self, *keys: str):
+        """
+        Drop keys from this worker's local cache and tell the other workers.
+        """
+        if not keys:
+            return
+
+        local_cache.delete(*keys)
+        if not self._available():
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.client.publish(INVALIDATION_CHANNEL, "\n".join(keys))
+            self._record_success("publish", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "publish", start)
+            logger.error(f"Redis publish error on {INVALIDATION_CHANNEL}: {e}")
+
+    async def listen_for_invalidations(self):
+        """
+        Long-running task: apply other workers' invalidations to the local cache.
+        Any gap in the subscription may have lost messages, so the local cache
+        is cleared whenever (re)subscribing, and bumps this worker could not
+        send meanwhile are replayed.
+        """
+        if not self.client:
+            return
+
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                local_cache.clear()
+                await self.flush_pending_bumps()
+                while True:
+                    # Poll with an explicit timeout: a blocking read would be
+                    # cut off by the (short) socket timeout
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        local_cache.delete(*message["data"].decode().split("\n"))
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, RedisError, Exception) as e:
+                logger.error(f"Redis invalidation listener error: {e}")
+                local_cache.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def acquire_lock(self, name: str, ttl_ms: int) -> Optional[str]:
+        """
+        Try to take a short-lived lock (SET NX PX) and return its owner token.
+        Returns None only when another client holds the lock; if Redis is
+        unavailable a token is still returned so the caller just proceeds.
+        """
+        token = uuid.uuid4().hex
+        if not self._available():
+            return token
+
+        start = time.perf_counter()
+        try:
+            acquired = await self.client.set(f"lock:{name}", token, nx=True, px=ttl_ms)
+            self._record_success("lock", start)
+            return token if acquired else None
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "lock", start)
+            logger.error(f"Redis acquire_lock error for {name}: {e}")
+            return token
+
+    async def release_lock(self, name: str, token: str):
+        if not self._available():
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.client.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token)
+            self._record_success("unlock", start)
+        except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "unlock", start)
+            logger.error(f"Redis release_lock error for {name}: {e}")
 
     async def delete_pattern(self, pattern: str):
         """
         Delete all keys matching a pattern.
         Uses scan_iter for safe iteration.
         """
-        if not self.client:
+        if not self._available():
             return
 
+        start = time.perf_counter()
         try:
-            keys = []
-            async for key in self.client.scan_iter(match=pattern):
-                keys.append(key)
-            
-            if keys:
-                await self.client.delete(*keys)
-                logger.info(f"Deleted {len(keys)} keys matching pattern: {pattern}")
+            deleted = 0
+            batch = []
+            async for key in self.client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.client.delete(*batch)
+            self._record_success("delete_pattern", start)
+
+            if deleted:
+                logger.info(f"Deleted {deleted} keys matching pattern: {pattern}")
         except (ConnectionError, RedisError, Exception) as e:
+            self._record_failure(e, "delete_pattern", start)
             logger.error(f"Redis delete_pattern error for pattern {pattern}: {e}")
 
 # Global instance
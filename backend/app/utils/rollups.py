@@ -0,0 +1,163 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, null, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.expense import Expense
+from app.models.rollup import BUCKET_CATEGORY, ExpenseDailyRollup
+
+
+# Rows per multi-row upsert, well under SQLite's and Postgres' bind
+# parameter limits (5 per row)
+_UPSERT_BATCH_ROWS = 1000
+
+
+def _upsert(db: Session):
+    """
+    Dialect INSERT supporting ON CONFLICT (Postgres and SQLite both do).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(ExpenseDailyRollup)
+    return sqlite.insert(ExpenseDailyRollup)
+
+
+def apply_rollup_delta(
+    db: Session,
+    user_id: int,
+    day: date,
+    category_id: Optional[int],
+    amount,
+    count: int,
+):
+    """
+    Add `amount`/`count` to the (user, day, category) bucket.
+    Must run inside the caller's transaction (caller commits).
+    """
+    apply_rollup_deltas(db, user_id, {(day, category_id): (amount, count)})
+
+
+def merge_category_rollups(db: Session, user_id: int, category_id: int):
+    """
+    Fold a category's buckets into the uncategorized bucket of each day,
+    as deleting the category does to its expenses.
+    Must run inside the caller's transaction (caller commits).
+    """
+    source = select(
+        ExpenseDailyRollup.user_id,
+        ExpenseDailyRollup.day,
+        null(),
+        ExpenseDailyRollup.total,
+        ExpenseDailyRollup.count,
+    ).where(
+        ExpenseDailyRollup.user_id == user_id,
+        ExpenseDailyRollup.category_id == category_id,
+    )
+    stmt = _upsert(db).from_select(["user_id", "day", "category_id", "total", "count"], source)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ExpenseDailyRollup.user_id, ExpenseDailyRollup.day, BUCKET_CATEGORY],
+            set_={
+                "total": ExpenseDailyRollup.total + stmt.excluded.total,
+                "count": ExpenseDailyRollup.count + stmt.excluded.count,
+            },
+        )
+    )
+    db.execute(
+        delete(ExpenseDailyRollup)
+        .where(
+            ExpenseDailyRollup.user_id == user_id,
+            ExpenseDailyRollup.category_id == category_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_rollup_deltas(db: Session, user_id: int, deltas: dict):
+    """
+    Apply a batch of deltas keyed by (day, category_id) -> (amount, count).
+    One multi-row INSERT ... ON CONFLICT DO UPDATE against the bucket unique
+    index (per _UPSERT_BATCH_ROWS buckets), so concurrent writers never lose
+    increments nor create a bucket twice; then, if anything was taken out,
+    one DELETE of the user's emptied buckets.
+    Must run inside the caller's transaction (caller commits).
+    """
+    if not deltas:
+        return
+
+    # Same row order in every batch, so concurrent batches don't deadlock
+    rows = [
+        {"user_id": user_id, "day": day, "category_id": category_id, "total": amount, "count": count}
+        for (day, category_id), (amount, count) in sorted(
+            deltas.items(), key=lambda kv: (kv[0][0], kv[0][1] or 0)
+        )
+    ]
+    for i in range(0, len(rows), _UPSERT_BATCH_ROWS):
+        stmt = _upsert(db).values(rows[i:i + _UPSERT_BATCH_ROWS])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ExpenseDailyRollup.user_id, ExpenseDailyRollup.day, BUCKET_CATEGORY],
+                set_={
+                    "total": ExpenseDailyRollup.total + stmt.excluded.total,
+                    "count": ExpenseDailyRollup.count + stmt.excluded.count,
+                },
+            )
+        )
+
+    if any(count < 0 for _, count in deltas.values()):
+        db.execute(
+            delete(ExpenseDailyRollup)
+            .where(ExpenseDailyRollup.user_id == user_id, ExpenseDailyRollup.count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def add_bucket_delta(deltas: dict, day: date, category_id: Optional[int], amount: float, count: int):
+    """
+    Accumulate a move into a (day, category_id) -> (amount, count) batch.
+    """
+    prev_amount, prev_count = deltas.get((day, category_id), (0.0, 0))
+    deltas[(day, category_id)] = (prev_amount + amount, prev_count + count)
+
+
+def net_bucket_deltas(deltas: dict) -> dict:
+    """
+    Drop moves that cancel out, and order buckets so that concurrent
+    batches touch rollup rows in the same order.
+    """
+    return {
+        bucket: (amount, count)
+        for bucket, (amount, count) in sorted(
+            deltas.items(), key=lambda kv: (kv[0][0], kv[0][1] or 0)
+        )
+        if round(amount, 2) or count
+    }
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute rollups from the raw expenses table (all users, or one user).
+    Returns the number of buckets written. Caller commits.
+    """
+    clear = delete(ExpenseDailyRollup)
+    source = select(
+        Expense.user_id,
+        Expense.date,
+        Expense.category_id,
+        func.sum(Expense.amount),
+        func.count(Expense.id),
+    )
+    if user_id is not None:
+        clear = clear.where(ExpenseDailyRollup.user_id == user_id)
+        source = source.where(Expense.user_id == user_id)
+    source = source.group_by(Expense.user_id, Expense.date, Expense.category_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(ExpenseDailyRollup).from_select(
+            ["user_id", "day", "category_id", "total", "count"],
+            source,
+        )
+    )
+    return result.rowcount
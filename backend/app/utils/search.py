@@ -0,0 +1,51 @@
+"""
+Full-text search over expense descriptions, using the text indexes defined
+with the Expense model.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Select, column, func, literal_column, table, text
+
+from app.models.expense import FTS_CONFIG, Expense, description_tsvector
+
+_fts = table("expenses_fts", column("rowid"), column("rank"))
+
+
+def search_terms(q: str) -> list[str]:
+    """
+    Words of a search string. Everything else (quotes, operators) is dropped,
+    so user input never reaches the query syntax of either backend.
+    """
+    return re.findall(r"\w+", q.lower())
+
+
+def apply_description_search(
+    stmt: Select, terms: list[str], dialect: str
+) -> tuple[Select, Optional[ColumnElement]]:
+    """
+    Restrict an Expense select to rows whose description contains every term
+    (as a word prefix, for search-as-you-type).
+    Returns the statement and an ORDER BY clause ranking the best match first
+    (None if the backend has no index to rank with).
+    """
+    if dialect == "postgresql":
+        query = func.to_tsquery(
+            text(f"'{FTS_CONFIG}'"), " & ".join(f"{t}:*" for t in terms)
+        )
+        vector = description_tsvector()
+        stmt = stmt.where(vector.op("@@")(query))
+        return stmt, func.ts_rank(vector, query).desc()
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in terms)
+        stmt = stmt.join(_fts, _fts.c.rowid == Expense.id).where(
+            literal_column("expenses_fts").op("MATCH")(match)
+        )
+        # FTS5's rank is bm25: lower is better
+        return stmt, _fts.c.rank.asc()
+
+    # No text index: plain substring match, unranked
+    for t in terms:
+        stmt = stmt.where(Expense.description.ilike(f"%{t}%"))
+    return stmt, None
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from app.core.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+    The first caller runs `fn`; callers arriving meanwhile await its result.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                # shield: a cancelled waiter must not cancel the leader's result
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader's request went away; the next caller takes over
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception as retrieved even when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+
+# Per-process instance
+single_flight = SingleFlight()
+
+
+async def compute_with_lock(
+    cache_key: str,
+    compute: Callable[[], Awaitable[bytes]],
+    ttl: int,
+    soft_ttl: Optional[int] = None,
+    guard_keys: Sequence[str] = (),
+) -> bytes:
+    """
+    Compute and cache a JSON payload once across workers.
+    A short Redis lock elects one worker; the others poll the cache for its
+    result and compute themselves once the lock is free again or the lock
+    holder takes too long.
+    With `guard_keys` (see RedisClient.version_keys) the payload is only
+    cached if none of them changed while computing: a write committing
+    meanwhile may not find the key to patch, and the result may predate it.
+    """
+    token = await redis_client.acquire_lock(cache_key, settings.SINGLE_FLIGHT_LOCK_MS)
+
+    if token is None:
+        poll = settings.SINGLE_FLIGHT_POLL_MS / 1000
+        deadline = asyncio.get_running_loop().time() + settings.SINGLE_FLIGHT_LOCK_MS / 1000
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(poll)
+            cached = await redis_client.get_raw(cache_key)
+            if cached is not None:
+                return cached[0]
+            # Released without a result (failed, or not cacheable)
+            token = await redis_client.acquire_lock(cache_key, settings.SINGLE_FLIGHT_LOCK_MS)
+            if token is not None:
+                break
+        else:
+            logger.info(f"Gave up waiting for {cache_key}, computing locally")
+
+    try:
+        if not guard_keys:
+            payload = await compute()
+            await redis_client.set_raw(cache_key, payload, ttl=ttl, soft_ttl=soft_ttl)
+            return payload
+
+        # Read before the database, so any write that commits after the
+        # compute's snapshot has not finished its cache work yet
+        guards = await redis_client.get_stored_many(list(guard_keys))
+        payload = await compute()
+        if guards is not None:
+            await redis_client.set_many_raw_if_guards_unchanged(
+                {cache_key: payload}, guards, ttl=ttl, soft_ttl=soft_ttl
+            )
+        return payload
+    finally:
+        if token is not None:
+            await redis_client.release_lock(cache_key, token)
+
+
+async def refresh_with_lock(
+    cache_key: str,
+    compute: Callable[[], Awaitable[bytes]],
+    ttl: int,
+    soft_ttl: Optional[int] = None,
+):
+    """
+    Recompute a stale cached payload, meant to run as a background task.
+    Only the worker holding the lock refreshes; the new payload is dropped if
+    a write patched or removed the cached one while it was being computed.
+    """
+    token = await redis_client.acquire_lock(cache_key, settings.SINGLE_FLIGHT_LOCK_MS)
+    if token is None:
+        return
+
+    try:
+        current = await redis_client.get_stored(cache_key)
+        if current is None:
+            return
+        payload = await compute()
+        await redis_client.set_raw_if_unchanged(
+            cache_key, current, payload, ttl=ttl, soft_ttl=soft_ttl
+        )
+    except Exception as e:
+        logger.error(f"Background refresh of {cache_key} failed: {e}")
+    finally:
+        await redis_client.release_lock(cache_key, token)
@@ -0,0 +1,190 @@
+import logging
+from calendar import monthrange
+from datetime import date
+from typing import Any, NamedTuple, Optional
+
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class StatsDelta(NamedTuple):
+    """
+    Change of one (day, category) bucket caused by an expense write.
+    """
+    day: date
+    category_id: Optional[int]
+    amount: float
+    count: int
+
+
+class _CannotApply(Exception):
+    """
+    Raised when a cached view cannot be patched safely and must be dropped.
+    """
+
+
+def _money(value: float) -> float:
+    # Cached totals mirror NUMERIC(.., 2) sums; keep float drift out of them
+    return round(value, 2)
+
+
+def _is_empty(value: float) -> bool:
+    return _money(value) <= 0
+
+
+def _apply_daily(payload: dict, deltas: list[StatsDelta]) -> dict:
+    points = {p["day"]: p for p in payload["points"]}
+    for d in deltas:
+        point = points.get(d.day.day)
+        if point is None:
+            raise _CannotApply("daily point missing")
+        point["total_amount"] = _money(point["total_amount"] + d.amount)
+    return payload
+
+
+def _apply_monthly(payload: dict, deltas: list[StatsDelta]) -> dict:
+    points = {p["month"]: p for p in payload["points"]}
+    for d in deltas:
+        point = points.setdefault(d.day.month, {"month": d.day.month, "total_amount": 0.0})
+        point["total_amount"] = _money(point["total_amount"] + d.amount)
+    payload["points"] = [
+        points[m] for m in sorted(points) if not _is_empty(points[m]["total_amount"])
+    ]
+    return payload
+
+
+def _apply_categories(payload: dict, deltas: list[StatsDelta]) -> dict:
+    entries = {c["category_id"]: c for c in payload["categories"]}
+    for d in deltas:
+        entry = entries.get(d.category_id)
+        if entry is None:
+            if d.category_id is not None:
+                # New category in this period: its name is not in the cache
+                raise _CannotApply("category name unknown")
+            entry = {"category_id": None, "category_name": "Uncategorized", "total_amount": 0.0}
+            entries[None] = entry
+            payload["categories"].append(entry)
+        entry["total_amount"] = _money(entry["total_amount"] + d.amount)
+    payload["categories"] = [
+        c for c in payload["categories"] if not _is_empty(c["total_amount"])
+    ]
+    return payload
+
+
+def _top_category(categories: list[dict]) -> tuple[Optional[str], float]:
+    named = [
+        c for c in categories
+        if c["category_id"] is not None and c.get("category_name")
+    ]
+    if not named:
+        return None, 0.0
+    best = max(c["total_amount"] for c in named)
+    leaders = [c for c in named if c["total_amount"] == best]
+    if len(leaders) > 1:
+        # The database breaks ties arbitrarily; let it recompute
+        raise _CannotApply("top category tie")
+    return leaders[0]["category_name"], best
+
+
+def _apply_summary(
+    payload: dict,
+    deltas: list[StatsDelta],
+    categories: Optional[list[dict]],
+) -> dict:
+    payload["total_spent"] = _money(payload["total_spent"] + sum(d.amount for d in deltas))
+    payload["transactions_count"] += sum(d.count for d in deltas)
+    days_in_month = monthrange(payload["year"], payload["month"])[1]
+    payload["avg_per_day"] = payload["total_spent"] / days_in_month
+
+    if any(d.category_id is not None for d in deltas):
+        if categories is None:
+            raise _CannotApply("top category unknown")
+        top_name, top_amount = _top_category(categories)
+        payload["top_category"] = top_name
+        payload["top_category_amount"] = top_amount
+    return payload
+
+
+def _apply_dashboard(
+    payload: dict,
+    month_deltas: list[StatsDelta],
+    year_deltas: list[StatsDelta],
+) -> dict:
+    # Every dashboard of the year embeds the yearly view; only the
+    # dashboard of the touched month needs its month views patched
+    _apply_monthly(payload["monthly"], year_deltas)
+    if month_deltas:
+        _apply_daily(payload["daily"], month_deltas)
+        _apply_categories(payload["categories"], month_deltas)
+        _apply_summary(payload["summary"], month_deltas, payload["categories"]["categories"])
+    return payload
+
+
+async def apply_stats_deltas(user_id: int, deltas: list[StatsDelta]):
+    """
+    Patch the user's cached stats views in place after an expense write
+    (call after commit). Views that cannot be patched safely are dropped;
+    if the update itself fails, the whole generation is invalidated.
+    """
+    deltas = [d for d in deltas if d.amount or d.count]
+    if not deltas:
+        return
+
+    generation = await redis_client.get_generation(user_id)
+    if generation is None:
+        return
+
+    def key(*parts: Any) -> str:
+        return redis_client.user_key(user_id, generation, *parts)
+
+    # Group deltas per view they touch
+    month_deltas: dict[tuple[int, int], list[StatsDelta]] = {}
+    year_deltas: dict[int, list[StatsDelta]] = {}
+    for d in deltas:
+        month_deltas.setdefault((d.day.year, d.day.month), []).append(d)
+        year_deltas.setdefault(d.day.year, []).append(d)
+
+    plan: dict[str, tuple[str, list[StatsDelta]]] = {}
+    for (y, m), items in month_deltas.items():
+        plan[key("daily", y, m)] = ("daily", items)
+        plan[key("category", y, m)] = ("category", items)
+        plan[key("summary", y, m)] = ("summary", items)
+    for y, items in year_deltas.items():
+        plan[key("monthly", y)] = ("monthly", items)
+        plan[key("category", y, "all")] = ("category", items)
+        for m in range(1, 13):
+            plan[key("dashboard", y, m)] = ("dashboard", items)
+
+    def transform(current: dict[str, Any]) -> dict[str, Any]:
+        updated: dict[str, Any] = {}
+
+        # Category views first: summaries take their top category from them
+        order = sorted(current, key=lambda k: plan[k][0] == "summary")
+        for k in order:
+            view, items = plan[k]
+            try:
+                if view == "daily":
+                    updated[k] = _apply_daily(current[k], items)
+                elif view == "monthly":
+                    updated[k] = _apply_monthly(current[k], items)
+                elif view == "category":
+                    updated[k] = _apply_categories(current[k], items)
+                elif view == "dashboard":
+                    y, m = current[k]["summary"]["year"], current[k]["summary"]["month"]
+                    updated[k] = _apply_dashboard(current[k], month_deltas.get((y, m), []), items)
+                elif view == "summary":
+                    y, m = current[k]["year"], current[k]["month"]
+                    source = updated.get(key("category", y, m))
+                    if source is None and updated.get(key("dashboard", y, m)):
+                        source = updated[key("dashboard", y, m)]["categories"]
+                    categories = source["categories"] if source else None
+                    updated[k] = _apply_summary(current[k], items, categories)
+            except _CannotApply as e:
+                logger.info(f"Dropping cached {view} view for user {user_id}: {e}")
+                updated[k] = None
+        return updated
+
+    applied = await redis_client.update_many(list(plan), transform)
+    if not applied:
+        await redis_client.bump_generation(user_id)
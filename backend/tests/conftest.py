@@ -0,0 +1,52 @@
+"""
+Runs the app in-process against a throwaway SQLite database.
+"""
+import os
+import tempfile
+
+# The engines are built at import time, so point them at a scratch
+# database (and no Redis) before the app is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.pop("REDIS_URL", None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def auth(client, request):
+    # One user per test module
+    credentials = {"email": f"{request.module.__name__}@example.com", "password": "pw123456"}
+    assert client.post("/api/auth/register", json=credentials).status_code == 201
+    r = client.post(
+        "/api/auth/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    )
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture
+def fake_redis():
+    """
+    Redis caching enabled for one test, backed by an in-memory fake.
+    """
+    import fakeredis
+
+    from app.utils.local_cache import local_cache
+    from app.utils.redis_client import redis_client
+
+    local_cache.clear()
+    redis_client.client = fakeredis.FakeAsyncRedis()
+    yield redis_client
+    redis_client.client = None
+    local_cache.clear()
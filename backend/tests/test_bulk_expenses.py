@@ -0,0 +1,67 @@
+"""
+POST /expenses/bulk: per-op results in one transaction.
+"""
+from app.api import expenses
+
+
+def _bulk(client, auth, **batch):
+    r = client.post("/api/expenses/bulk", headers=auth, json=batch)
+    assert r.status_code == 200, r.text
+    return r.json()["results"]
+
+
+def _summary(client, auth) -> dict:
+    r = client.get("/api/stats/summary", headers=auth, params={"year": 2026, "month": 7})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_results_per_op_with_not_found(client, auth, fake_redis):
+    created = _bulk(client, auth, create=[
+        {"amount": 10, "date": "2026-07-01", "description": "a"},
+        {"amount": 20, "date": "2026-07-02", "description": "b"},
+    ])
+    assert [(r["op"], r["index"], r["status"]) for r in created] == [("create", 0, "ok"), ("create", 1, "ok")]
+    assert [r["expense"]["amount"] for r in created] == [10, 20]
+    a, b = (r["id"] for r in created)
+    assert _summary(client, auth)["total_spent"] == 30
+
+    results = _bulk(
+        client, auth,
+        create=[{"amount": 5, "date": "2026-07-03"}],
+        update=[{"id": a, "amount": 15}, {"id": 10**9, "amount": 1}],
+        delete=[b, 10**9, b],
+    )
+    assert [(r["op"], r["index"], r["id"], r["status"]) for r in results[1:]] == [
+        ("update", 0, a, "ok"),
+        ("update", 1, 10**9, "not_found"),
+        ("delete", 0, b, "ok"),
+        ("delete", 1, 10**9, "not_found"),
+        ("delete", 2, b, "not_found"),
+    ]
+    assert results[1]["expense"]["amount"] == 15
+    assert all(r.get("expense") is None for r in results if r["op"] == "delete")
+
+    # Cached stats were patched for the whole batch
+    summary = _summary(client, auth)
+    assert summary["total_spent"] == 20
+    assert summary["transactions_count"] == 2
+
+
+def test_other_users_expenses_are_not_found(client, auth):
+    credentials = {"email": "bulk-other@example.com", "password": "pw123456"}
+    assert client.post("/api/auth/register", json=credentials).status_code == 201
+    token = client.post(
+        "/api/auth/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    ).json()["access_token"]
+    [theirs] = _bulk(client, {"Authorization": f"Bearer {token}"}, create=[{"amount": 1, "date": "2026-07-04"}])
+
+    results = _bulk(client, auth, update=[{"id": theirs["id"], "amount": 2}], delete=[theirs["id"]])
+    assert [r["status"] for r in results] == ["not_found", "not_found"]
+
+
+def test_oversized_batch_is_rejected(client, auth, monkeypatch):
+    monkeypatch.setattr(expenses, "BULK_MAX_ITEMS", 2)
+    r = client.post("/api/expenses/bulk", headers=auth, json={"delete": [1, 2, 3]})
+    assert r.status_code == 413
@@ -0,0 +1,36 @@
+"""
+CSV import writes each row once, stamped with one change number.
+"""
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.core.query_counter import count_queries
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.user import User
+
+
+def test_import_inserts_rows_already_stamped(client, auth):
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+    body = (
+        "Date,Amount,Description,Category\n"
+        "2026-07-01,4.50,coffee,Cafe\n"
+        "2026-07-02,12.00,book,Books\n"
+        "2026-07-02,3.00,tea,Cafe\n"
+    )
+
+    with count_queries() as log:
+        r = client.post("/api/data/import", headers=auth, files={"file": ("x.csv", body, "text/csv")})
+    assert r.status_code == 200, r.text
+
+    # New categories are flushed mid-file; nothing may be rewritten after
+    rewrites = [sql for sql in log.statements if sql.startswith(("UPDATE expenses", "UPDATE categories"))]
+    assert rewrites == []
+
+    with SessionLocal() as db:
+        seq = db.scalar(select(User.change_seq).where(User.id == user_id))
+        expense_seqs = set(db.scalars(select(Expense.change_seq).where(Expense.user_id == user_id)))
+        category_seqs = set(db.scalars(
+            select(Category.change_seq).where(Category.user_id == user_id, Category.name.in_(["Cafe", "Books"]))
+        ))
+    assert expense_seqs == category_seqs == {seq}
@@ -0,0 +1,32 @@
+"""
+Out-of-range year/month query parameters are rejected as invalid input.
+"""
+import pytest
+
+
+@pytest.mark.parametrize("path", [
+    "/api/budgets",
+    "/api/stats/summary",
+    "/api/stats/categories",
+    "/api/stats/daily",
+    "/api/stats/dashboard",
+])
+@pytest.mark.parametrize("params", [
+    {"month": 13},
+    {"month": 0},
+    {"year": 0},
+    {"year": 9999, "month": 12},
+])
+def test_out_of_range_dates_are_422(client, auth, path, params):
+    r = client.get(path, headers=auth, params=params)
+    assert r.status_code == 422, r.text
+
+
+def test_monthly_rejects_year_zero(client, auth):
+    assert client.get("/api/stats/monthly", headers=auth, params={"year": 0}).status_code == 422
+
+
+@pytest.mark.parametrize("path", ["/api/budgets", "/api/stats/categories"])
+def test_december_is_accepted(client, auth, path):
+    r = client.get(path, headers=auth, params={"year": 2026, "month": 12})
+    assert r.status_code == 200, r.text
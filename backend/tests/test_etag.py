@@ -0,0 +1,47 @@
+"""
+ETag / If-None-Match revalidation of stats and expense listings.
+"""
+import pytest
+
+PERIOD = {"year": 2026, "month": 5}
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/stats/summary", PERIOD),
+    ("/api/stats/dashboard", PERIOD),
+    ("/api/expenses/", {"limit": 10}),
+])
+def test_current_etag_gets_304_until_a_write(client, auth, fake_redis, path, params):
+    r = client.get(path, headers=auth, params=params)
+    assert r.status_code == 200, r.text
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, no-cache"
+
+    r = client.get(path, headers={**auth, "If-None-Match": etag}, params=params)
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert not r.content
+
+    r = client.post("/api/expenses/", headers=auth, json={"amount": 3, "date": "2026-05-02"})
+    assert r.status_code == 201, r.text
+
+    r = client.get(path, headers={**auth, "If-None-Match": etag}, params=params)
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_etag_depends_on_the_parameters(client, auth, fake_redis):
+    first = client.get("/api/stats/summary", headers=auth, params=PERIOD).headers["etag"]
+    r = client.get(
+        "/api/stats/summary",
+        headers={**auth, "If-None-Match": first},
+        params={"year": 2026, "month": 6},
+    )
+    assert r.status_code == 200
+    assert r.headers["etag"] != first
+
+
+def test_no_etag_without_redis(client, auth):
+    r = client.get("/api/stats/summary", headers=auth, params=PERIOD)
+    assert r.status_code == 200
+    assert "etag" not in r.headers
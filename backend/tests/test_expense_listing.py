@@ -0,0 +1,68 @@
+"""
+GET /expenses: keyset pagination.
+"""
+from datetime import date, datetime
+
+from app.core.database import SessionLocal
+from app.models.expense import Expense
+
+RANGE = {"from_date": "2026-02-01", "to_date": "2026-02-28"}
+
+
+def _bulk_create(client, auth, *items):
+    r = client.post("/api/expenses/bulk", headers=auth, json={"create": list(items)})
+    assert r.status_code == 200, r.text
+    return [result["id"] for result in r.json()["results"]]
+
+
+def _walk(client, auth, params, limit):
+    ids, cursor = [], None
+    while True:
+        page_params = {**params, "limit": limit}
+        if cursor:
+            page_params["cursor"] = cursor
+        r = client.get("/api/expenses/", headers=auth, params=page_params)
+        assert r.status_code == 200, r.text
+        ids += [e["id"] for e in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_have_no_duplicates_or_gaps(client, auth):
+    # Rows of a day share date and created_at: only ids order them
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+    created_at = datetime(2026, 2, 12, 9, 30)
+    with SessionLocal() as db:
+        rows = [
+            Expense(user_id=user_id, date=date(2026, 2, day), amount=i + 1, created_at=created_at)
+            for day in (10, 11, 12) for i in range(7)
+        ]
+        db.add_all(rows)
+        db.commit()
+        created = [row.id for row in rows]
+
+    ids = _walk(client, auth, RANGE, limit=4)
+    assert sorted(ids) == sorted(created)
+    assert len(ids) == len(set(ids))
+    assert ids == [e["id"] for e in client.get(
+        "/api/expenses/", headers=auth, params={**RANGE, "limit": 100}
+    ).json()]
+
+
+def test_cursor_skips_rows_written_before_it(client, auth):
+    first = client.get("/api/expenses/", headers=auth, params={**RANGE, "limit": 4})
+    cursor = first.headers["x-next-cursor"]
+    seen = {e["id"] for e in first.json()}
+
+    # A row newer than the cursor does not shift later pages
+    _bulk_create(client, auth, {"amount": 1, "date": "2026-02-28"})
+    r = client.get("/api/expenses/", headers=auth, params={**RANGE, "limit": 100, "cursor": cursor})
+    rest = {e["id"] for e in r.json()}
+    assert not seen & rest
+    assert len(seen | rest) == 21
+
+
+def test_invalid_cursor_is_rejected(client, auth):
+    r = client.get("/api/expenses/", headers=auth, params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
@@ -0,0 +1,56 @@
+"""
+GET /expenses?q=: full-text search over descriptions.
+"""
+
+
+def _create(client, auth, description, day="2026-09-01"):
+    r = client.post("/api/expenses/", headers=auth, json={"amount": 1, "date": day, "description": description})
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _search(client, auth, q, **params):
+    r = client.get("/api/expenses/", headers=auth, params={"q": q, **params})
+    assert r.status_code == 200, r.text
+    return [e["id"] for e in r.json()]
+
+
+def test_search_matches_every_word_as_a_prefix(client, auth):
+    coffee = _create(client, auth, "Coffee beans from the market")
+    latte = _create(client, auth, "Latte and coffee cake")
+    _create(client, auth, "Train ticket")
+
+    assert set(_search(client, auth, "coffee")) == {coffee, latte}
+    assert _search(client, auth, "COFF mark") == [coffee]
+    assert _search(client, auth, "coffee train") == []
+
+
+def test_search_follows_updates_and_deletes(client, auth):
+    expense_id = _create(client, auth, "Bicycle repair")
+    assert _search(client, auth, "bicycle") == [expense_id]
+
+    r = client.put(f"/api/expenses/{expense_id}", headers=auth, json={"description": "Scooter repair"})
+    assert r.status_code == 200, r.text
+    assert _search(client, auth, "bicycle") == []
+    assert _search(client, auth, "scooter") == [expense_id]
+
+    assert client.delete(f"/api/expenses/{expense_id}", headers=auth).status_code in (200, 204)
+    assert _search(client, auth, "scooter") == []
+
+
+def test_search_input_is_not_query_syntax(client, auth):
+    # Quotes, operators and wildcards are just words (or dropped)
+    expense_id = _create(client, auth, "Groceries: milk OR bread")
+    assert _search(client, auth, 'milk" OR "x*') == []
+    assert _search(client, auth, "(milk) AND bread*") == []
+    assert _search(client, auth, '"milk" bread') == [expense_id]
+
+
+def test_search_combines_with_filters_and_rejects_cursor(client, auth):
+    early = _create(client, auth, "Parking garage", day="2026-09-02")
+    late = _create(client, auth, "Parking meter", day="2026-09-20")
+    assert _search(client, auth, "parking", from_date="2026-09-10") == [late]
+    assert set(_search(client, auth, "parking")) == {early, late}
+
+    r = client.get("/api/expenses/", headers=auth, params={"q": "parking", "cursor": "x"})
+    assert r.status_code == 400
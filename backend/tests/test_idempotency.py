@@ -0,0 +1,52 @@
+"""
+Idempotency-Key on POST /expenses: retries replay the first response.
+"""
+import pytest
+
+from app.api import expenses
+
+EXPENSE = {"amount": 12.5, "date": "2026-04-03", "description": "retried"}
+
+
+def _create(client, auth, key, body=EXPENSE):
+    return client.post("/api/expenses/", headers={**auth, "Idempotency-Key": key}, json=body)
+
+
+def _count(client, auth) -> int:
+    r = client.get("/api/expenses/", headers=auth, params={"totals": True})
+    return int(r.headers["x-total-count"])
+
+
+def test_retry_replays_the_first_response(client, auth, fake_redis):
+    before = _count(client, auth)
+    first = _create(client, auth, "retry-1")
+    assert first.status_code == 201, first.text
+    assert "idempotent-replayed" not in first.headers
+
+    retry = _create(client, auth, "retry-1")
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert _count(client, auth) == before + 1
+
+
+def test_reused_key_with_another_payload_is_rejected(client, auth, fake_redis):
+    assert _create(client, auth, "retry-2").status_code == 201
+
+    r = _create(client, auth, "retry-2", {**EXPENSE, "amount": 99})
+    assert r.status_code == 422
+    assert "Idempotency-Key" in r.json()["detail"]
+
+
+def test_failed_request_releases_its_key(client, auth, fake_redis, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(expenses, "apply_rollup_delta", fail)
+    with pytest.raises(RuntimeError):
+        _create(client, auth, "retry-3")
+    monkeypatch.undo()
+
+    r = _create(client, auth, "retry-3")
+    assert r.status_code == 201, r.text
+    assert "idempotent-replayed" not in r.headers
@@ -0,0 +1,46 @@
+"""
+The deferred invalidation worker across app lifespans.
+"""
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.invalidation import invalidations
+
+PERIOD = {"year": 2026, "month": 11}
+
+
+def _write_then_read(client, auth, amount) -> float:
+    r = client.post("/api/expenses/", headers=auth, json={"amount": amount, "date": "2026-11-02"})
+    assert r.status_code == 201, r.text
+    r = client.get("/api/stats/summary", headers=auth, params=PERIOD)
+    assert r.status_code == 200, r.text
+    return r.json()["total_spent"]
+
+
+def test_worker_runs_in_every_lifespan(client, auth, fake_redis):
+    # Each TestClient runs the app on a new event loop
+    for total in (5, 10):
+        with TestClient(app) as other:
+            assert invalidations.running
+            assert client.get("/api/stats/summary", headers=auth, params=PERIOD).status_code == 200
+            assert _write_then_read(other, auth, 5) == total
+        assert not invalidations.running
+        assert not invalidations._jobs
+
+
+def test_worker_failure_is_logged(client, auth, fake_redis, monkeypatch, caplog):
+    async def fail(user_id=None):
+        raise RuntimeError("flush failed")
+
+    with TestClient(app) as other:
+        monkeypatch.setattr(invalidations, "flush", fail)
+        with caplog.at_level(logging.ERROR, logger="app.utils.invalidation"):
+            r = other.post("/api/expenses/", headers=auth, json={"amount": 1, "date": "2026-11-03"})
+            assert r.status_code == 201, r.text
+            other.portal.call(invalidations.stop)
+        monkeypatch.undo()
+        other.portal.call(invalidations.flush)
+    assert "Cache invalidation worker failed" in caplog.text
+    assert "flush failed" in caplog.text
@@ -0,0 +1,77 @@
+"""
+The local (L1) cache never keeps a value read before an invalidation.
+"""
+import asyncio
+
+from app.utils.local_cache import local_cache
+
+
+def _with_invalidation_during_read(redis_client, method: str, key: str):
+    """
+    Make the next `method` call on the Redis connection see an invalidation
+    message arrive while it is in flight.
+    """
+    original = getattr(redis_client.client, method)
+
+    async def read_then_invalidate(*args, **kwargs):
+        result = await original(*args, **kwargs)
+        # What listen_for_invalidations does on a message
+        local_cache.delete(key)
+        return result
+
+    setattr(redis_client.client, method, read_then_invalidate)
+
+
+def test_get_raw_does_not_refill_invalidated_key(fake_redis):
+    key = "user:1:g0:summary:2026:3"
+
+    async def scenario():
+        await fake_redis.client.set(key, b'{"total_spent": 10.0}')
+        local_cache.clear()
+        _with_invalidation_during_read(fake_redis, "get", key)
+        entry = await fake_redis.get_raw(key)
+        assert entry == (b'{"total_spent": 10.0}', False)
+
+    asyncio.run(scenario())
+    assert local_cache.get(key) is None
+
+
+def test_get_many_raw_does_not_refill_invalidated_keys(fake_redis):
+    keys = ["user:1:g0:daily:2026:3", "user:1:g0:monthly:2026"]
+
+    async def scenario():
+        for key in keys:
+            await fake_redis.client.set(key, b"{}")
+        local_cache.clear()
+        _with_invalidation_during_read(fake_redis, "mget", keys[0])
+        assert set(await fake_redis.get_many_raw(keys)) == set(keys)
+
+    asyncio.run(scenario())
+    assert all(local_cache.get(key) is None for key in keys)
+
+
+def test_counters_are_not_refilled_after_invalidation(fake_redis):
+    user_id = 7
+    pending = fake_redis.pending_key(user_id)
+
+    async def scenario():
+        await fake_redis.client.set(pending, 1)
+        local_cache.clear()
+        _with_invalidation_during_read(fake_redis, "mget", pending)
+        assert await fake_redis.get_user_versions(user_id) == (None, None)
+
+    asyncio.run(scenario())
+    # A stale pending mark would hide the user's cache for the L1 TTL
+    assert local_cache.get(pending) is None
+
+
+def test_reads_fill_local_cache_without_invalidation(fake_redis):
+    key = "user:1:g0:summary:2026:4"
+
+    async def scenario():
+        await fake_redis.client.set(key, b"{}")
+        local_cache.clear()
+        await fake_redis.get_raw(key)
+
+    asyncio.run(scenario())
+    assert local_cache.get(key) == (b"{}", None)
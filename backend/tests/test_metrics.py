@@ -0,0 +1,48 @@
+"""
+GET /metrics: token gate and exposed series.
+"""
+import re
+
+import pytest
+
+from app import main
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(main.settings, "METRICS_TOKEN", "scrape-me")
+    return {"Authorization": "Bearer scrape-me"}
+
+
+def _sample(text: str, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    assert match, series
+    return float(match.group(1))
+
+
+def test_metrics_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(main.settings, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_token(client, token):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+
+def test_metrics_expose_requests_queries_and_pool(client, auth, token):
+    assert client.get("/api/expenses/", headers=auth).status_code == 200
+
+    r = client.get("/metrics", headers=token)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert _sample(
+        text,
+        'http_request_duration_seconds_count{method="GET",route="/api/expenses/",status="200"}',
+    ) >= 1
+    assert _sample(text, 'db_queries_total{engine="async"}') >= 1
+    assert _sample(text, 'db_pool_checkouts_total{engine="async"}') >= 1
+    assert _sample(text, 'db_pool_connects_total{engine="async"}') >= 1
+    # Every request has returned its connection
+    assert _sample(text, 'db_pool_checked_out{engine="async"}') == 0
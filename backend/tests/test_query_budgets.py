@@ -0,0 +1,54 @@
+"""
+Query budgets for endpoints that used to issue N+1 queries.
+"""
+import pytest
+
+from app.core.query_counter import assert_max_queries
+
+
+@pytest.fixture(scope="module")
+def categories(client, auth):
+    with assert_max_queries(5):
+        r = client.post("/api/categories/seed", headers=auth)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_seed_categories_is_idempotent_and_bounded(client, auth, categories):
+    with assert_max_queries(2):
+        r = client.post("/api/categories/seed", headers=auth)
+    assert r.status_code == 200, r.text
+    assert len(r.json()) == len(categories)
+
+
+def test_export_does_not_query_per_row(client, auth, categories):
+    for i in range(20):
+        r = client.post("/api/expenses", headers=auth, json={
+            "amount": 1 + i,
+            "date": f"2026-01-{i % 28 + 1:02d}",
+            "description": f"expense {i}",
+            "category_id": categories[i % len(categories)]["id"],
+        })
+        assert r.status_code in (200, 201), r.text
+
+    with assert_max_queries(1):
+        r = client.get("/api/data/export", headers=auth)
+    assert r.status_code == 200, r.text
+    assert r.text.count("\n") == 21
+
+
+def test_budgets_do_not_query_per_budget(client, auth, categories):
+    for category in categories[:6]:
+        r = client.post("/api/budgets", headers=auth, json={
+            "category_id": category["id"],
+            "amount": 100,
+            "month": "2026-01-01",
+        })
+        assert r.status_code in (200, 201), r.text
+
+    with assert_max_queries(3, repeat_threshold=2):
+        r = client.get("/api/budgets", headers=auth, params={"year": 2026, "month": 1})
+    assert r.status_code == 200, r.text
+    budgets = r.json()
+    assert len(budgets) == 6
+    assert all(b["spent"] > 0 for b in budgets)
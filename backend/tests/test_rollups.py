@@ -0,0 +1,86 @@
+"""
+Daily rollups stay equal to a rebuild from expenses, written in bulk.
+"""
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.core.query_counter import count_queries
+from app.models.rollup import ExpenseDailyRollup
+from app.utils.rollups import rebuild_rollups
+
+
+def _user_id(client, auth) -> int:
+    return client.get("/api/auth/me", headers=auth).json()["id"]
+
+
+def _rollups(user_id: int) -> set:
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                ExpenseDailyRollup.day,
+                ExpenseDailyRollup.category_id,
+                ExpenseDailyRollup.total,
+                ExpenseDailyRollup.count,
+            ).where(ExpenseDailyRollup.user_id == user_id)
+        ).all()
+    return {tuple(r) for r in rows}
+
+
+def _rebuilt(user_id: int) -> set:
+    with SessionLocal() as db:
+        rebuild_rollups(db, user_id)
+        rows = db.execute(
+            select(
+                ExpenseDailyRollup.day,
+                ExpenseDailyRollup.category_id,
+                ExpenseDailyRollup.total,
+                ExpenseDailyRollup.count,
+            ).where(ExpenseDailyRollup.user_id == user_id)
+        ).all()
+        db.rollback()
+    return {tuple(r) for r in rows}
+
+
+def _import(client, auth, lines: list[str]):
+    body = "Date,Amount,Description,Category\n" + "\n".join(lines) + "\n"
+    return client.post(
+        "/api/data/import", headers=auth, files={"file": ("expenses.csv", body, "text/csv")}
+    )
+
+
+def test_import_upserts_all_buckets_in_one_statement(client, auth):
+    user_id = _user_id(client, auth)
+    lines = [f"2026-05-{day:02d},{day}.50,row {day},Imported" for day in range(1, 30)]
+    lines += ["2026-05-01,1.00,again,Imported", "2026-05-02,2.00,uncategorized,"]
+
+    with count_queries() as log:
+        r = _import(client, auth, lines)
+    assert r.status_code == 200, r.text
+
+    upserts = [n for sql, n in log.statements.items() if "expense_daily_rollups" in sql and "INSERT" in sql]
+    assert upserts == [1]
+    assert _rollups(user_id) == _rebuilt(user_id)
+
+
+def test_moves_and_deletes_keep_rollups_exact(client, auth):
+    user_id = _user_id(client, auth)
+    category_id = client.post("/api/categories/", headers=auth, json={"name": "Moves"}).json()["id"]
+
+    ids = []
+    for amount, category in ((5, None), (10, category_id), (2.25, category_id)):
+        r = client.post("/api/expenses", headers=auth, json={
+            "amount": amount, "date": "2026-06-10", "description": "x", "category_id": category,
+        })
+        assert r.status_code in (200, 201), r.text
+        ids.append(r.json()["id"])
+
+    r = client.put(f"/api/expenses/{ids[2]}", headers=auth, json={"date": "2026-06-11", "category_id": None})
+    assert r.status_code == 200, r.text
+    assert client.delete(f"/api/expenses/{ids[0]}", headers=auth).status_code in (200, 204)
+    assert _rollups(user_id) == _rebuilt(user_id)
+
+    # Its buckets fold into the uncategorized ones
+    assert client.delete(f"/api/categories/{category_id}", headers=auth).status_code in (200, 204)
+    assert _rollups(user_id) == _rebuilt(user_id)
+    june = [row for row in _rollups(user_id) if row[0].month == 6]
+    assert june and all(category is None for _, category, _, _ in june)
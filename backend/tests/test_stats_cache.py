@@ -0,0 +1,158 @@
+"""
+Cached stats stay equal to a fresh computation across writes.
+"""
+from datetime import date
+
+import pytest
+
+from app.api import stats
+from app.core.database import SessionLocal
+from app.models.expense import Expense
+from app.utils.invalidation import invalidations
+from app.utils.rollups import apply_rollup_delta
+from app.utils.stats_cache import StatsDelta
+
+DAY = date(2026, 3, 14)
+PERIOD = {"year": DAY.year, "month": DAY.month}
+
+
+def _summary(client, auth):
+    r = client.get("/api/stats/summary", headers=auth, params=PERIOD)
+    assert r.status_code == 200, r.text
+    return r
+
+
+def test_miss_computed_during_a_write_is_not_cached(client, auth, fake_redis, monkeypatch):
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+    r = client.post("/api/expenses", headers=auth, json={
+        "amount": 10, "date": DAY.isoformat(), "description": "before",
+    })
+    assert r.status_code in (200, 201), r.text
+
+    compute_summary = stats._compute_summary
+
+    async def compute_then_write(db, uid, y, m):
+        # The view is computed, then another request's write commits and
+        # runs its cache work before the view is stored
+        result = await compute_summary(db, uid, y, m)
+        with SessionLocal() as write_db:
+            write_db.add(Expense(user_id=user_id, date=DAY, amount=5, description="during"))
+            apply_rollup_delta(write_db, user_id, DAY, None, 5, 1)
+            write_db.commit()
+        await invalidations.schedule(user_id, [StatsDelta(DAY, None, 5.0, 1)])
+        await invalidations.flush(user_id)
+        return result
+
+    monkeypatch.setattr(stats, "_compute_summary", compute_then_write)
+    assert _summary(client, auth).json()["total_spent"] == 10.0
+    monkeypatch.undo()
+
+    body = _summary(client, auth).json()
+    assert body["total_spent"] == 15.0
+    assert body["transactions_count"] == 2
+
+
+MONTHS = [(2027, 3), (2027, 4)]
+
+
+def _views():
+    for y, m in MONTHS:
+        for path in ("summary", "daily", "categories", "dashboard"):
+            yield path, {"year": y, "month": m}
+    yield "monthly", {"year": 2027}
+
+
+def _get(client, auth, path, params):
+    r = client.get(f"/api/stats/{path}", headers=auth, params=params)
+    assert r.status_code == 200, r.text
+    return r
+
+
+def _warm(client, auth):
+    for path, params in _views():
+        _get(client, auth, path, params)
+
+
+def _normalized(body: dict) -> dict:
+    # Category order is not part of the response contract
+    for view in (body, body.get("categories")):
+        if isinstance(view, dict) and isinstance(view.get("categories"), list):
+            view["categories"].sort(key=lambda c: c["category_id"] or 0)
+    return body
+
+
+def _assert_cache_matches_recompute(client, auth, redis):
+    cached = {(path, tuple(params.items())): _get(client, auth, path, params) for path, params in _views()}
+    connection, redis.client = redis.client, None
+    try:
+        for (path, params), response in cached.items():
+            fresh = _get(client, auth, path, dict(params)).json()
+            assert _normalized(response.json()) == _normalized(fresh), (
+                path, params, response.headers.get("x-cache")
+            )
+    finally:
+        redis.client = connection
+    return {key: r.headers.get("x-cache") for key, r in cached.items()}
+
+
+def test_patched_stats_equal_a_recompute(client, auth, fake_redis):
+    food = client.post("/api/categories/", headers=auth, json={"name": "Patch food"}).json()["id"]
+    fuel = client.post("/api/categories/", headers=auth, json={"name": "Patch fuel"}).json()["id"]
+
+    def create(amount, day, category_id=None):
+        r = client.post("/api/expenses", headers=auth, json={
+            "amount": amount, "date": day, "description": "x", "category_id": category_id,
+        })
+        assert r.status_code in (200, 201), r.text
+        return r.json()["id"]
+
+    expense_id = create(10, "2027-03-05", food)
+    create(4, "2027-03-06")
+    create(3.5, "2027-03-20", fuel)
+    _warm(client, auth)
+
+    # Create
+    create(7.5, "2027-03-05", fuel)
+    _assert_cache_matches_recompute(client, auth, fake_redis)
+
+    # Update in place: patched, not recomputed
+    r = client.put(f"/api/expenses/{expense_id}", headers=auth, json={"amount": 12.25})
+    assert r.status_code == 200, r.text
+    statuses = _assert_cache_matches_recompute(client, auth, fake_redis)
+    assert statuses[("daily", (("year", 2027), ("month", 3)))] == "HIT"
+
+    # Move to another month and category
+    r = client.put(f"/api/expenses/{expense_id}", headers=auth, json={"date": "2027-04-10", "category_id": fuel})
+    assert r.status_code == 200, r.text
+    _assert_cache_matches_recompute(client, auth, fake_redis)
+
+    # Delete
+    assert client.delete(f"/api/expenses/{expense_id}", headers=auth).status_code in (200, 204)
+    _assert_cache_matches_recompute(client, auth, fake_redis)
+
+
+def test_stale_view_is_served_then_refreshed(client, auth, fake_redis):
+    from app.utils.local_cache import local_cache
+
+    params = {"year": 2027, "month": 9}
+    assert _get(client, auth, "summary", params).headers["x-cache"] == "MISS"
+
+    # A write the cache never hears about, and an entry past its soft TTL
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+    with SessionLocal() as db:
+        db.add(Expense(user_id=user_id, date=date(2027, 9, 1), amount=8, description="unseen"))
+        apply_rollup_delta(db, user_id, date(2027, 9, 1), None, 8, 1)
+        db.commit()
+    [key] = client.portal.call(fake_redis.client.keys, "*:summary:2027:9")
+    payload, _ = fake_redis.decode_entry(client.portal.call(fake_redis.client.get, key))
+    client.portal.call(fake_redis.client.set, key, fake_redis.encode_entry(payload, 1.0))
+    local_cache.clear()
+
+    r = _get(client, auth, "summary", params)
+    assert r.headers["x-cache"] == "STALE"
+    assert r.json()["total_spent"] == 0
+
+    # The background refresh ran after that response
+    r = _get(client, auth, "summary", params)
+    assert r.headers["x-cache"] == "HIT"
+    assert r.json()["total_spent"] == 8
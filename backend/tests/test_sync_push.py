@@ -0,0 +1,143 @@
+"""
+POST /sync/push: op replay, conflict rules and tombstones.
+"""
+from datetime import datetime, timedelta
+
+
+def _push(client, auth, *ops):
+    r = client.post("/api/sync/push", headers=auth, json={"ops": list(ops)})
+    assert r.status_code == 200, r.text
+    return r.json()["results"]
+
+
+def _token(client, auth) -> str:
+    return client.get("/api/sync/changes", headers=auth).json()["token"]
+
+
+def _create(client, auth, client_id: str, amount: float = 10) -> dict:
+    [result] = _push(client, auth, {
+        "op": "create", "client_id": client_id,
+        "expense": {"amount": amount, "date": "2026-08-01", "description": client_id},
+    })
+    assert result["status"] == "applied"
+    return result
+
+
+def _edit_on_server(client, auth, expense_id: int, amount: float):
+    r = client.put(f"/api/expenses/{expense_id}", headers=auth, json={"amount": amount})
+    assert r.status_code == 200, r.text
+
+
+def test_reject_keeps_server_copy_written_since_base_version(client, auth):
+    created = _create(client, auth, "reject-1")
+    _edit_on_server(client, auth, created["id"], 20)
+
+    [result] = _push(client, auth, {
+        "op": "update", "client_id": "reject-1", "on_conflict": "reject",
+        "base_version": created["version"], "expense": {"amount": 30},
+    })
+    assert result["status"] == "conflict"
+    assert result["expense"]["amount"] == 20
+
+
+def test_reject_applies_when_base_version_is_current(client, auth):
+    created = _create(client, auth, "reject-2")
+
+    [result] = _push(client, auth, {
+        "op": "update", "client_id": "reject-2", "on_conflict": "reject",
+        "base_version": created["version"], "expense": {"amount": 30},
+    })
+    assert result["status"] == "applied"
+    assert result["version"] > created["version"]
+
+
+def test_lww_keeps_whichever_write_was_last(client, auth):
+    created = _create(client, auth, "lww-1")
+    _edit_on_server(client, auth, created["id"], 20)
+    stale = {"op": "update", "client_id": "lww-1", "base_version": created["version"]}
+
+    older = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    [result] = _push(client, auth, {**stale, "modified_at": older, "expense": {"amount": 30}})
+    assert result["status"] == "conflict"
+    assert result["expense"]["amount"] == 20
+
+    newer = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    [result] = _push(client, auth, {**stale, "modified_at": newer, "expense": {"amount": 40}})
+    assert result["status"] == "applied"
+
+    # Without modified_at the push is the last writer
+    _edit_on_server(client, auth, created["id"], 50)
+    [result] = _push(client, auth, {**stale, "expense": {"amount": 60}})
+    assert result["status"] == "applied"
+
+
+def test_delete_leaves_one_tombstone_and_replays_as_not_found(client, auth):
+    created = _create(client, auth, "tomb-1")
+    since = _token(client, auth)
+
+    delete = {"op": "delete", "client_id": "tomb-1"}
+    assert _push(client, auth, delete)[0]["status"] == "applied"
+    # A retried push of the same log
+    assert _push(client, auth, delete)[0]["status"] == "not_found"
+
+    body = client.get("/api/sync/changes", headers=auth, params={"since": since}).json()
+    assert body["deleted"]["expenses"] == [created["id"]]
+    assert all(e["id"] != created["id"] for e in body["expenses"])
+
+
+def test_create_is_applied_once_when_replayed(client, auth):
+    first = _create(client, auth, "replay-1")
+    again = _create(client, auth, "replay-1", amount=99)
+    assert again["id"] == first["id"]
+
+    expenses = client.get("/api/sync/changes", headers=auth).json()["expenses"]
+    assert [e["amount"] for e in expenses if e["client_id"] == "replay-1"] == [10]
+
+
+def test_create_delete_create_in_one_push_recreates_the_row(client, auth):
+    create = {
+        "op": "create", "client_id": "again-1",
+        "expense": {"amount": 5, "date": "2026-08-02", "description": "first"},
+    }
+    results = _push(client, auth, create, {"op": "delete", "client_id": "again-1"}, {
+        **create, "expense": {"amount": 7, "date": "2026-08-03", "description": "second"},
+    })
+    assert [r["status"] for r in results] == ["applied"] * 3
+    assert results[2]["id"] is not None
+
+    expenses = client.get("/api/sync/changes", headers=auth).json()["expenses"]
+    [row] = [e for e in expenses if e["client_id"] == "again-1"]
+    assert (row["id"], row["amount"], row["date"]) == (results[2]["id"], 7, "2026-08-03")
+
+
+def test_stored_row_deleted_and_recreated_in_one_push(client, auth):
+    created = _create(client, auth, "again-2")
+    since = _token(client, auth)
+
+    results = _push(client, auth, {"op": "delete", "client_id": "again-2"}, {
+        "op": "create", "client_id": "again-2",
+        "expense": {"amount": 8, "date": "2026-08-04", "description": "back"},
+    })
+    assert [r["status"] for r in results] == ["applied", "applied"]
+
+    body = client.get("/api/sync/changes", headers=auth, params={"since": since}).json()
+    assert body["deleted"]["expenses"] == []
+    [row] = [e for e in body["expenses"] if e["client_id"] == "again-2"]
+    assert (row["id"], row["amount"]) == (created["id"], 8)
+
+
+def test_update_nulling_a_required_field_is_rejected(client, auth):
+    created = _create(client, auth, "null-1")
+
+    results = _push(
+        client, auth,
+        {"op": "update", "client_id": "null-1", "expense": {"amount": None}},
+        {"op": "update", "client_id": "null-1", "expense": {"date": None}},
+        {"op": "update", "client_id": "null-1", "expense": {"description": None}},
+    )
+    assert [r["status"] for r in results] == ["rejected", "rejected", "applied"]
+    assert "amount" in results[0]["detail"] and "date" in results[1]["detail"]
+
+    expenses = client.get("/api/sync/changes", headers=auth).json()["expenses"]
+    [row] = [e for e in expenses if e["id"] == created["id"]]
+    assert (row["amount"], row["date"], row["description"]) == (10, "2026-08-01", None)
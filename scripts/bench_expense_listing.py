@@ -0,0 +1,135 @@
+import sys
+import os
+import json
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Compare the per-page cost of listing expenses as ORM objects vs projected columns.")
+parser.add_argument("--rows", type=int, default=100_000, help="Expenses of the benchmark user")
+parser.add_argument("--limit", type=int, default=50, help="Page size")
+parser.add_argument("--pages", type=int, default=200, help="Pages per measurement")
+args = parser.parse_args()
+
+# Throwaway SQLite database; must be set before the app modules are imported
+db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import desc, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.database import Base, engine
+from app.models.user import User
+from app.models.category import Category
+from app.models.expense import Expense
+from app.schemas.expense import ExpenseRead
+from app.api.expenses import CATEGORY_COLUMNS, EXPENSE_COLUMNS
+from app.utils.redis_client import redis_client
+
+Base.metadata.create_all(bind=engine)
+
+print(f"⏳ Seeding {args.rows} expenses into {db_path} ...")
+with Session(engine) as db:
+    user = User(email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    user_id = user.id
+    db.execute(insert(Category), [
+        {"user_id": user_id, "name": f"Category {i}", "color": "#94a3b8", "icon": "📁"}
+        for i in range(12)
+    ])
+    category_ids = db.scalars(select(Category.id)).all() + [None]
+    start = date(2020, 1, 1)
+    created = datetime(2020, 1, 1)
+    db.execute(insert(Expense), [
+        {
+            "user_id": user_id,
+            "category_id": random.choice(category_ids),
+            "date": start + timedelta(days=i * 2000 // args.rows),
+            "amount": round(random.uniform(1, 200), 2),
+            "description": f"Expense number {i}",
+            "created_at": created + timedelta(seconds=i),
+        }
+        for i in range(args.rows)
+    ])
+    db.commit()
+
+order = (desc(Expense.date), desc(Expense.created_at), desc(Expense.id))
+
+
+def orm_page(db: Session) -> bytes:
+    # Before: full ORM objects, category via selectinload, response_model validation
+    expenses = db.scalars(
+        select(Expense)
+        .where(Expense.user_id == user_id)
+        .order_by(*order)
+        .limit(args.limit)
+        .options(selectinload(Expense.category))
+    ).all()
+    validated = [ExpenseRead.model_validate(e) for e in expenses]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def projected_page(db: Session, fields=tuple(EXPENSE_COLUMNS)) -> bytes:
+    # After: only the needed columns as row tuples, dicts encoded by orjson
+    category_fields = tuple(CATEGORY_COLUMNS)
+    rows = db.execute(
+        select(*[EXPENSE_COLUMNS[f] for f in fields], *CATEGORY_COLUMNS.values())
+        .select_from(Expense)
+        .outerjoin(Category, Expense.category_id == Category.id)
+        .where(Expense.user_id == user_id)
+        .order_by(*order)
+        .limit(args.limit)
+    ).all()
+    n = len(fields)
+    items = []
+    for row in rows:
+        item = dict(zip(fields, row[:n]))
+        item["category"] = dict(zip(category_fields, row[n:])) if row[n] is not None else None
+        items.append(item)
+    return redis_client.dumps(items)
+
+
+def sparse_page(db: Session) -> bytes:
+    # fields=id,amount,date
+    fields = ("id", "amount", "date")
+    rows = db.execute(
+        select(*[EXPENSE_COLUMNS[f] for f in fields])
+        .where(Expense.user_id == user_id)
+        .order_by(*order)
+        .limit(args.limit)
+    ).all()
+    return redis_client.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def measure(fn) -> tuple[float, float]:
+    """
+    (CPU µs per page, peak KiB allocated while building one page)
+    """
+    with Session(engine) as db:
+        fn(db)  # warm up
+        cpu = time.process_time()
+        for _ in range(args.pages):
+            fn(db)
+        cpu_us = (time.process_time() - cpu) / args.pages * 1e6
+
+        tracemalloc.start()
+        fn(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return cpu_us, peak / 1024
+
+
+print(f"⚡ {args.rows} rows, pages of {args.limit}, {args.pages} pages per measurement")
+base_cpu, base_mem = measure(orm_page)
+print(f"ORM + response_model        : {base_cpu:8.0f} µs/page  {base_mem:7.0f} KiB peak")
+for label, fn in (("projected columns + orjson", projected_page), ("sparse fields=id,amount,date", sparse_page)):
+    cpu_us, mem = measure(fn)
+    print(f"{label:28}: {cpu_us:8.0f} µs/page  {mem:7.0f} KiB peak  ({base_cpu / cpu_us:.1f}x CPU, {base_mem / mem:.1f}x memory)")
@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+import argparse
+import timeit
+from datetime import date
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas.stats import (
+    SummaryStats,
+    MonthlyStats,
+    MonthlyPoint,
+    DailyStats,
+    DailyPoint,
+    CategoryStats,
+    CategoryPoint,
+    DashboardStats,
+)
+from app.utils.redis_client import redis_client
+
+parser = argparse.ArgumentParser(description="Compare the per-request cost of serving cached stats as parsed JSON vs raw bytes.")
+parser.add_argument("--number", type=int, default=5000, help="Iterations per measurement")
+parser.add_argument("--categories", type=int, default=12, help="Categories in the sample dashboard")
+args = parser.parse_args()
+
+# A realistic /stats/dashboard payload for one month
+y, m = 2026, 1
+categories = [
+    CategoryPoint(category_id=i, category_name=f"Category {i}", total_amount=round(i * 41.37, 2))
+    for i in range(1, args.categories + 1)
+]
+view = DashboardStats(
+    summary=SummaryStats(
+        period="month", year=y, month=m, total_spent=1234.56, avg_per_day=39.82,
+        transactions_count=87, top_category="Category 1", top_category_amount=496.44,
+    ),
+    daily=DailyStats(
+        year=y, month=m,
+        points=[DailyPoint(day=d, date=date(y, m, d), total_amount=round(d * 3.1, 2)) for d in range(1, 32)],
+    ),
+    categories=CategoryStats(year=y, month=m, categories=categories),
+    monthly=MonthlyStats(year=y, points=[MonthlyPoint(month=i, total_amount=i * 100.0) for i in range(1, 13)]),
+)
+
+stored_json = json.dumps(jsonable_encoder(view))  # what the old cache held
+stored_bytes = redis_client.dumps(view.model_dump())  # what the cache holds now
+
+
+def hit_parsed():
+    # Old HIT: json.loads, response_model validation, re-encoding
+    data = json.loads(stored_json)
+    validated = DashboardStats.model_validate(data)
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+
+def hit_raw():
+    # New HIT: stored bytes go out as the body
+    return Response(content=stored_bytes, media_type="application/json").body
+
+
+def miss_json():
+    # Old MISS: stdlib json with a date-aware default (the former CustomEncoder)
+    return json.dumps(view.model_dump(), default=lambda o: o.isoformat())
+
+
+def miss_orjson():
+    return redis_client.dumps(view.model_dump())
+
+
+def measure(fn) -> float:
+    return min(timeit.repeat(fn, number=args.number, repeat=3)) / args.number * 1e6
+
+
+print(f"⚡ Dashboard payload: {len(stored_bytes)} bytes, {args.number} iterations")
+for label, old, new in (
+    ("HIT  (parse+validate+encode vs raw bytes)", hit_parsed, hit_raw),
+    ("MISS (json.dumps vs orjson)", miss_json, miss_orjson),
+):
+    old_us, new_us = measure(old), measure(new)
+    print(f"{label}: {old_us:8.1f} µs -> {new_us:6.1f} µs  ({old_us / new_us:.0f}x)")
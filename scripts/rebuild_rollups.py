@@ -0,0 +1,54 @@
+import sys
+import os
+import argparse
+import asyncio
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from sqlalchemy import select, union
+
+from app.core.database import SessionLocal
+# Not used directly: registers the mappers Expense's relationships refer to
+from app.models import budget, category, user  # noqa: F401
+from app.models.expense import Expense
+from app.models.rollup import ExpenseDailyRollup
+from app.utils.redis_client import redis_client
+from app.utils.rollups import rebuild_rollups
+
+parser = argparse.ArgumentParser(description="Rebuild expense_daily_rollups from the expenses table.")
+parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user (default: everyone)")
+args = parser.parse_args()
+
+scope = f"user {args.user_id}" if args.user_id else "all users"
+print(f"⚡ Rebuilding daily rollups for {scope}...")
+
+
+async def invalidate_caches(user_ids: list[int]):
+    # Cached stats were patched from the old rollups: drop them, and let
+    # clients revalidate their ETags
+    for user_id in user_ids:
+        await redis_client.bump_generation(user_id)
+        await redis_client.bump_data_version(user_id)
+
+
+db = SessionLocal()
+try:
+    if args.user_id:
+        user_ids = [args.user_id]
+    else:
+        # Users with expenses, or with rollups left from deleted ones
+        user_ids = list(db.scalars(union(
+            select(Expense.user_id).distinct(),
+            select(ExpenseDailyRollup.user_id).distinct(),
+        )))
+    buckets = rebuild_rollups(db, user_id=args.user_id)
+    db.commit()
+    print(f"✅ Wrote {buckets} rollup buckets.")
+    asyncio.run(invalidate_caches(user_ids))
+    print(f"✅ Invalidated cached stats of {len(user_ids)} users.")
+except Exception as e:
+    db.rollback()
+    print(f"❌ Error rebuilding rollups: {e}")
+finally:
+    db.close()